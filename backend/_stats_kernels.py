@@ -0,0 +1,61 @@
+"""Reduction kernels for usage dashboard statistics, JIT-compiled with Numba when available."""
+import logging
+from typing import Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Rows are split into this many chunks, each reducing into its own partial histogram,
+# so parallel iterations never write the same bin
+_CHUNKS = 64
+
+def _histogram_numpy(codes: np.ndarray, k: int) -> np.ndarray:
+    return np.bincount(codes, minlength=k)
+
+def _llm_reduce_numpy(model_codes: np.ndarray, latencies: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        np.bincount(model_codes, minlength=k),
+        np.bincount(model_codes, weights=latencies, minlength=k)
+    )
+
+histogram = _histogram_numpy
+llm_reduce = _llm_reduce_numpy
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _histogram_numba(codes, k):
+        n = codes.shape[0]
+        step = (n + _CHUNKS - 1) // _CHUNKS
+        partial = np.zeros((_CHUNKS, k), np.int64)
+        for c in prange(_CHUNKS):
+            for i in range(c * step, min((c + 1) * step, n)):
+                partial[c, codes[i]] += 1
+        return partial.sum(axis=0)
+
+    @njit(cache=True, parallel=True)
+    def _llm_reduce_numba(model_codes, latencies, k):
+        n = model_codes.shape[0]
+        step = (n + _CHUNKS - 1) // _CHUNKS
+        counts = np.zeros((_CHUNKS, k), np.int64)
+        sums = np.zeros((_CHUNKS, k), np.float64)
+        for c in prange(_CHUNKS):
+            for i in range(c * step, min((c + 1) * step, n)):
+                code = model_codes[i]
+                counts[c, code] += 1
+                sums[c, code] += latencies[i]
+        return counts.sum(axis=0), sums.sum(axis=0)
+
+    try:
+        # Compile (or load from the on-disk cache) now, so the first dashboard request doesn't pay for it
+        _histogram_numba(np.zeros(1, np.int32), 1)
+        _llm_reduce_numba(np.zeros(1, np.int32), np.zeros(1, np.float64), 1)
+    except Exception as e:
+        logger.warning(f"Numba stats kernels unavailable, using NumPy: {str(e)}")
+    else:
+        histogram = _histogram_numba
+        llm_reduce = _llm_reduce_numba
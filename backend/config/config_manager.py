@@ -4,7 +4,9 @@ import os
 import base64
 import hashlib
 import difflib
-from typing import Dict, Any, Optional, List, Tuple, Union
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import threading
@@ -30,6 +32,11 @@ CONFIG_CACHE_HITS = Counter('config_cache_hits_total', 'Configuration cache hits
 CONFIG_CACHE_MISSES = Counter('config_cache_misses_total', 'Configuration cache misses')
 CONFIG_MEMORY_USAGE = Gauge('config_memory_usage_bytes', 'Configuration memory usage')
 
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: Union[str, re.Pattern]) -> re.Pattern:
+    """Compile a validation pattern once and reuse it"""
+    return re.compile(pattern)
+
 @dataclass
 class ConfigValue:
     """Enhanced configuration value information"""
@@ -126,6 +133,7 @@ class ConfigManager:
         self.values = {}
         self.files = {}
         self.schemas = {}
+        self.schema_validators = {}
         self.templates = {}
         self.history = {}
         self.dependencies = {}
@@ -305,18 +313,27 @@ class ConfigManager:
                     description=profile_info.get('description')
                 )
     
-    def _load_environment_variables(self):
-        """Load configuration from environment variables"""
+    def _load_environment_variables(self, *, keys: Optional[Iterable[str]] = None):
+        """Load configuration from environment variables
+        
+        keys limits a reload to those config keys: each CONFIG_<KEY> variable
+        is looked up directly instead of scanning all of os.environ.
+        """
         try:
-            for key, value in os.environ.items():
-                if key.startswith('CONFIG_'):
-                    config_key = key[7:].lower()
-                    self.set_value(
-                        config_key,
-                        value,
-                        source='environment',
-                        environment=self.default_environment
-                    )
+            if keys is None:
+                variables = [(key, value) for key, value in os.environ.items() if key.startswith('CONFIG_')]
+            else:
+                variables = [(f'CONFIG_{key.upper()}', os.environ.get(f'CONFIG_{key.upper()}')) for key in keys]
+            for key, value in variables:
+                if value is None:
+                    continue
+                config_key = key[7:].lower()
+                self.set_value(
+                    config_key,
+                    value,
+                    source='environment',
+                    environment=self.default_environment
+                )
         except Exception as e:
             logger.error("Error loading environment variables", exc_info=True)
     
@@ -335,8 +352,11 @@ class ConfigManager:
                     with open(schema_path, 'r') as f:
                         schema = json.load(f)
                     
+                    validator = jsonschema.Draft7Validator(schema)
+                    
                     with self.schemas_lock:
                         self.schemas[schema_name] = schema
+                        self.schema_validators[schema_name] = validator
         except Exception as e:
             logger.error("Error loading schemas", exc_info=True)
     
@@ -568,6 +588,14 @@ class ConfigManager:
             logger.error("Error getting all values", exc_info=True)
             return {}
     
+    def get_raw(self, key: str) -> Any:
+        """Get the stored (possibly encrypted) value without decrypting
+        
+        A single dict lookup is atomic under the GIL, so no lock is taken.
+        """
+        value = self.values.get(key)
+        return value.value if value is not None else None
+    
     def get_value_info(self, key: str) -> Optional[Dict[str, Any]]:
         """Get configuration value information"""
         try:
@@ -679,8 +707,7 @@ class ConfigManager:
             
             # Check pattern
             if 'pattern' in validation:
-                import re
-                if not re.match(validation['pattern'], str(value)):
+                if not _compile_pattern(validation['pattern']).match(str(value)):
                     return False
             
             # Check enum
@@ -1230,10 +1257,12 @@ class ConfigManager:
                 if schema_name not in self.schemas:
                     raise ValueError(f"Schema {schema_name} does not exist")
                 
-                schema = self.schemas[schema_name]
+                validator = self.schema_validators.get(schema_name)
+                if validator is None:
+                    validator = jsonschema.Draft7Validator(self.schemas[schema_name])
+                    self.schema_validators[schema_name] = validator
             
             # Validate values
-            validator = jsonschema.Draft7Validator(schema)
             errors = list(validator.iter_errors(values))
             
             return len(errors) == 0, [str(e) for e in errors]
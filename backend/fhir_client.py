@@ -271,10 +271,12 @@ class FHIRClient:
             if not patient_data:
                 return None
 
-            # Get related resources
-            observations = await self._fetch_observations(patient_id)
-            medications = await self._fetch_medications(patient_id)
-            conditions = await self._fetch_conditions(patient_id)
+            # Get related resources concurrently
+            observations, medications, conditions = await asyncio.gather(
+                self._fetch_observations(patient_id),
+                self._fetch_medications(patient_id),
+                self._fetch_conditions(patient_id)
+            )
 
             # Process and normalize the data
             processed_data = self._process_patient_data(
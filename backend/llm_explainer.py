@@ -1,9 +1,18 @@
 import os
+import re
+import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from dotenv import load_dotenv
 import openai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+try:
+    from openai import RateLimitError, APITimeoutError as OpenAITimeout
+except ImportError:  # openai<1.0
+    from openai.error import RateLimitError, Timeout as OpenAITimeout
 
 # Load environment variables
 load_dotenv()
@@ -12,36 +21,173 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class LLMExplainer:
+# Failures worth retrying before falling back to the template explanation
+TRANSIENT_ERRORS = (RateLimitError, OpenAITimeout, asyncio.TimeoutError, TimeoutError)
+
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def _parse_reset(value: Optional[str]) -> float:
+    """Parse OpenAI reset durations such as '20ms', '1s' or '6m0s' into seconds."""
+    return sum(
+        float(amount) * _DURATION_UNITS[unit]
+        for amount, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value or "")
+    )
+
+def _error_headers(error: Exception):
+    """Response headers attached to an OpenAI error, across client versions."""
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    return headers or {}
+
+class RateLimitGate:
+    """Holds back the next OpenAI call while the rate-limit headers report no budget left."""
+
     def __init__(self):
+        self._resume_at = 0.0
+
+    def update(self, headers) -> None:
+        delays = []
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and float(remaining) <= 0:
+                delays.append(_parse_reset(headers.get(f"x-ratelimit-reset-{kind}")))
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                delays.append(float(retry_after))
+            except ValueError:
+                pass
+        if delays:
+            self._resume_at = max(self._resume_at, time.monotonic() + max(delays))
+
+    async def wait(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# Completion budget for one explanation, and the most a single gpt-4 completion may ask for
+EXPLANATION_MAX_TOKENS = 500
+MAX_COMPLETION_TOKENS = 4096
+
+_json_decoder = json.JSONDecoder()
+
+def _parse_explanations(content: Optional[str], count: int) -> List[Optional[str]]:
+    """Read a JSON array reply element by element; cases without a usable string get None."""
+    explanations: List[Optional[str]] = []
+    text = (content or "").strip()
+    pos = 1 if text.startswith("[") else len(text)
+    while len(explanations) < count:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            value, pos = _json_decoder.raw_decode(text, pos)
+        except ValueError:
+            # Malformed or truncated element: later ones can't be located reliably
+            break
+        explanations.append(value if isinstance(value, str) and value.strip() else None)
+    explanations += [None] * (count - len(explanations))
+    missing = explanations.count(None)
+    if missing:
+        logger.warning(f"Batch reply lacked usable explanations for {missing} of {count} cases")
+    return explanations
+
+SYSTEM_PROMPT = "You are a clinical decision support system that provides clear, evidence-based explanations for medical alerts."
+
+class ExplainBatcher:
+    """Coalesces concurrent explain() calls into a single multi-shot completion."""
+
+    def __init__(self, explainer: "LLMExplainer", max_batch_size: int = 8,
+                 max_wait: float = 0.01, max_concurrent_requests: int = 4):
+        self.explainer = explainer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrent_requests = max_concurrent_requests
+        # Created on first use so it binds to the running loop (Python 3.9)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: List[Tuple[Tuple[str, Dict[str, Any]], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def add(self, item: Tuple[str, Dict[str, Any]]) -> Optional[str]:
+        """Queue a (rule_id, patient_data) pair and wait for its explanation."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        try:
+            async with self._semaphore:
+                results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def process_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[str]]:
+        """Explain every queued item with one OpenAI call."""
+        if len(items) == 1:
+            rule_id, patient_data = items[0]
+            prompt = self.explainer._create_prompt(rule_id, patient_data)
+            return [await self.explainer._complete(prompt, max_tokens=EXPLANATION_MAX_TOKENS)]
+
+        prompt = self.explainer._create_batch_prompt(items)
+        content = await self.explainer._complete(
+            prompt, max_tokens=min(EXPLANATION_MAX_TOKENS * len(items), MAX_COMPLETION_TOKENS)
+        )
+        # Cases missing from the reply fall back to their template on their own
+        return _parse_explanations(content, len(items))
+
+class LLMExplainer:
+    def __init__(self, max_batch_size: int = 8, max_concurrent_requests: int = 4, max_attempts: int = 5):
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             logger.warning("No OpenAI API key found. Explanations will be template-based only.")
         else:
             openai.api_key = self.api_key
+        self.batcher = ExplainBatcher(
+            self,
+            max_batch_size=max_batch_size,
+            max_concurrent_requests=max_concurrent_requests
+        )
+        self.max_attempts = max_attempts
+        self.retry_wait = wait_random_exponential(multiplier=1, max=60)
+        self.rate_limit_gate = RateLimitGate()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def explain(self, rule_id: str, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate an explanation for a triggered rule using LLM."""
         try:
             if not self.api_key:
                 return self._generate_template_explanation(rule_id, patient_data)
 
-            # Prepare the prompt
-            prompt = self._create_prompt(rule_id, patient_data)
-            
-            # Call OpenAI API
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a clinical decision support system that provides clear, evidence-based explanations for medical alerts."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
-
-            explanation = response.choices[0].message.content
+            # Concurrent callers share one OpenAI round-trip
+            explanation = await self.batcher.add((rule_id, patient_data))
+            if explanation is None:
+                return self._generate_template_explanation(rule_id, patient_data)
 
             return {
                 "rule_id": rule_id,
@@ -54,6 +200,44 @@ class LLMExplainer:
             logger.error(f"Error generating explanation: {str(e)}")
             return self._generate_template_explanation(rule_id, patient_data)
 
+    async def _complete(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Send a chat completion request, retrying rate limits and timeouts with jittered backoff."""
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type(TRANSIENT_ERRORS),
+            wait=self.retry_wait,
+            stop=stop_after_attempt(self.max_attempts),
+            reraise=True
+        ):
+            with attempt:
+                await self.rate_limit_gate.wait()
+                try:
+                    response = await openai.ChatCompletion.acreate(
+                        model="gpt-4",
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.7,
+                        max_tokens=max_tokens
+                    )
+                except RateLimitError as e:
+                    self.rate_limit_gate.update(_error_headers(e))
+                    logger.warning(f"OpenAI rate limit hit (attempt {attempt.retry_state.attempt_number})")
+                    raise
+        return response.choices[0].message.content
+
+    def _create_batch_prompt(self, items: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Combine several alerts into one prompt that asks for a JSON array of explanations."""
+        cases = "\n".join(
+            f"Case {i}:\n{self._create_prompt(rule_id, patient_data)}"
+            for i, (rule_id, patient_data) in enumerate(items, 1)
+        )
+        return (
+            f"{cases}\n"
+            f"Respond with a JSON array of exactly {len(items)} strings, "
+            f"one explanation per case, in the same order."
+        )
+
     def _create_prompt(self, rule_id: str, patient_data: Dict[str, Any]) -> str:
         """Create a prompt for the LLM based on the rule and patient data."""
         return f"""
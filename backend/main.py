@@ -47,6 +47,7 @@ from backend.feedback import FeedbackSystem
 from backend.smart_launch import router as smart_router
 from backend.explainability import RuleExplainer
 from backend.trie_engine import TrieEngine
+from backend.security.security_manager import stop_metrics_flush_all
 
 # Setup logging
 setup_logging()
@@ -215,10 +216,16 @@ async def startup_event():
         rules = rule_loader.load_rules()
         for rule in rules:
             trie_engine.add_rule(rule)
+        trie_engine.freeze()
     except Exception as e:
         logger.error(f"Failed to load rules: {str(e)}")
         raise
 
+# Flush queued security metrics before the process exits
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_metrics_flush_all()
+
 # API endpoints
 @app.get("/")
 async def root():
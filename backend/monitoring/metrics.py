@@ -1,5 +1,5 @@
 import prometheus_client
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 import logging
 from dataclasses import dataclass, field
@@ -267,6 +267,21 @@ class SecurityMetrics:
         except Exception as e:
             logger.error("Error updating API usage metric", exc_info=True)
             
+    @classmethod
+    def bulk_update_api_usage(cls, batch: List[Tuple[str, int]]):
+        """Update API usage metric from a batch of (endpoint, count) pairs"""
+        try:
+            totals: Dict[str, int] = {}
+            for endpoint, count in batch:
+                totals[endpoint] = totals.get(endpoint, 0) + count
+            for endpoint, count in totals.items():
+                cls.api_usage.record(
+                    count,
+                    {'endpoint': endpoint} if endpoint else None
+                )
+        except Exception as e:
+            logger.error("Error bulk updating API usage metric", exc_info=True)
+            
     @classmethod
     def update_access_patterns(cls, count: int, pattern: str = None):
         """Update access patterns metric"""
@@ -1,9 +1,22 @@
 import os
 import yaml
+import orjson
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from pydantic import BaseModel, Field, validator
 from enum import Enum
+from functools import lru_cache
+
+# libyaml-backed C loader/dumper when PyYAML was built with it, pure Python otherwise
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,9 +57,46 @@ class Rule(BaseModel):
     conditions: List[Condition]
     actions: List[Action]
 
+class FastRule:
+    """Slotted rule built after JSON Schema validation; conditions/actions stay plain dicts."""
+    __slots__ = ("id", "text", "category", "severity", "confidence", "conditions", "actions")
+
+    def __init__(self, id: str, text: str, conditions: List[Dict[str, Any]], actions: List[Dict[str, Any]],
+                 category: str = None, severity: str = SeverityLevel.INFO, confidence: float = 1.0, **_):
+        self.id = id
+        self.text = text
+        self.category = category
+        self.severity = SeverityLevel(severity)
+        self.confidence = confidence
+        self.conditions = conditions
+        self.actions = actions
+
+RULE_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "rules", "rule.schema.json")
+
+# Opt-in: validate with the precompiled JSON Schema and build FastRule instead of pydantic
+RULE_FAST_VALIDATION = os.getenv("RULE_FAST_VALIDATION", "false").lower() == "true"
+
+def _compile_rule_schema():
+    with open(RULE_SCHEMA_PATH, "rb") as f:
+        return fastjsonschema.compile(orjson.loads(f.read()))
+
+_fast_validate = _compile_rule_schema() if RULE_FAST_VALIDATION and fastjsonschema else None
+
+def _build_rule(rule_data: Dict[str, Any]):
+    if _fast_validate is not None:
+        return FastRule(**_fast_validate(rule_data))
+    return Rule(**rule_data)
+
+@lru_cache(maxsize=512)
+def _validate_frozen(frozen_json: bytes):
+    """Validate canonical rule JSON; equal rule dicts share one validation run."""
+    return _build_rule(orjson.loads(frozen_json))
+
 class RuleLoader:
     def __init__(self, rules_dir: str = None):
         self.rules_dir = rules_dir or os.path.join(os.path.dirname(__file__), "rules")
+        # path -> (st_mtime_ns, st_size, validated rules); unchanged files skip YAML + pydantic
+        self._yaml_cache: Dict[str, Tuple[int, int, List[Rule]]] = {}
 
     def load_rules(self) -> List[Any]:
         """Load and validate all rules from the rules directory."""
@@ -55,19 +105,28 @@ class RuleLoader:
             for filename in os.listdir(self.rules_dir):
                 if filename.endswith(".yaml"):
                     rule_path = os.path.join(self.rules_dir, filename)
+                    st = os.stat(rule_path)
+                    cached = self._yaml_cache.get(rule_path)
+                    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                        rules.extend(cached[2])
+                        continue
+
+                    file_rules = []
                     with open(rule_path, "r") as f:
                         # Load all documents from the YAML file
-                        for rule_data in yaml.safe_load_all(f):
+                        for rule_data in yaml.load_all(f, Loader=SafeLoader):
                             if rule_data is None:
                                 continue
                             try:
                                 # Validate rule structure
-                                rule = Rule(**rule_data)
-                                rules.append(rule)
+                                rule = _build_rule(rule_data)
+                                file_rules.append(rule)
                                 logger.info(f"Successfully loaded rule: {rule.id}")
                             except Exception as e:
                                 logger.error(f"Error validating rule in {filename}: {str(e)}")
                                 continue
+                    self._yaml_cache[rule_path] = (st.st_mtime_ns, st.st_size, file_rules)
+                    rules.extend(file_rules)
         except Exception as e:
             logger.error(f"Error loading rules: {str(e)}")
             return []
@@ -76,7 +135,13 @@ class RuleLoader:
     def validate_rule(self, rule_data: Dict[str, Any]) -> bool:
         """Validate a single rule's structure."""
         try:
-            Rule(**rule_data)
+            try:
+                key = orjson.dumps(rule_data, option=orjson.OPT_SORT_KEYS)
+            except TypeError:
+                # Not JSON-serialisable, so it cannot be memoized
+                _build_rule(rule_data)
+            else:
+                _validate_frozen(key)
             return True
         except Exception as e:
             logger.error(f"Error validating rule: {str(e)}")
@@ -95,8 +160,9 @@ class RuleLoader:
 
             # Save rule to file
             with open(filepath, "w") as f:
-                yaml.dump(rule_data, f, default_flow_style=False)
+                yaml.dump(rule_data, f, Dumper=SafeDumper, default_flow_style=False)
             
+            _validate_frozen.cache_clear()
             logger.info(f"Successfully saved rule: {rule_data['id']}")
             return True
         except Exception as e:
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import jwt
 import bcrypt
@@ -7,11 +8,19 @@ from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 import hashlib
 import re
+import weakref
+from collections import deque
 from dataclasses import dataclass
-from .metrics import SecurityMetrics
+from ..monitoring.metrics import SecurityMetrics
 
 logger = logging.getLogger(__name__)
 
+# Translation table stripping potentially dangerous characters
+_SANITIZE_TABLE = str.maketrans('', '', '<>')
+
+# Live managers, so application shutdown can flush their queued metrics
+_managers: "weakref.WeakSet[SecurityManager]" = weakref.WeakSet()
+
 @dataclass
 class SecurityContext:
     """Security context information"""
@@ -45,6 +54,15 @@ class SecurityManager:
             'max_age_days': 90
         }
         
+        # Buffered metric emission (drained off the request path)
+        self._metrics_q: deque = deque(maxlen=8192)
+        self.metrics_flush_interval = 0.1  # seconds
+        self._metrics_task: Optional[asyncio.Task] = None
+        # Entries evicted from the full queue, in total and since the last flush
+        self.dropped_metrics = 0
+        self._dropped_since_flush = 0
+        _managers.add(self)
+        
     def generate_token(
         self,
         user_id: str,
@@ -89,7 +107,7 @@ class SecurityManager:
             )
             
             # Update metrics
-            SecurityMetrics.update_api_usage(1, 'token_generation')
+            self._record_api_usage('token_generation')
             
             return access_token, refresh_token
             
@@ -128,7 +146,7 @@ class SecurityManager:
             )
             
             # Update metrics
-            SecurityMetrics.update_api_usage(1, 'token_verification')
+            self._record_api_usage('token_verification')
             
             return security_context
             
@@ -190,7 +208,7 @@ class SecurityManager:
             )
             
             # Update metrics
-            SecurityMetrics.update_api_usage(1, 'token_revocation')
+            self._record_api_usage('token_revocation')
             
         except Exception as e:
             logger.error("Error revoking token", exc_info=True)
@@ -344,11 +362,11 @@ class SecurityManager:
         """Sanitize user input"""
         try:
             # Remove potentially dangerous characters
-            sanitized = re.sub(r'[<>]', '', input_str)
+            sanitized = input_str.translate(_SANITIZE_TABLE)
             
-            # Update metrics
+            # Update metrics (translate only ever removes characters)
             SecurityMetrics.update_suspicious_activities(
-                1 if sanitized != input_str else 0,
+                int(len(sanitized) != len(input_str)),
                 'input_sanitization'
             )
             
@@ -385,6 +403,74 @@ class SecurityManager:
             logger.error("Error hashing session ID", exc_info=True)
             raise SecurityError("Session ID hashing failed")
 
+    def _record_api_usage(self, endpoint: str):
+        """Queue an API usage metric for the background flush task"""
+        if len(self._metrics_q) == self._metrics_q.maxlen:
+            # The deque evicts its oldest entry on append; count it so the loss is reported
+            self.dropped_metrics += 1
+            self._dropped_since_flush += 1
+        self._metrics_q.append((endpoint, 1))
+        self._ensure_metrics_task()
+    
+    def _ensure_metrics_task(self):
+        """Start the metrics flush task if an event loop is running"""
+        if self._metrics_task is not None and not self._metrics_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No running loop; metrics stay queued until flush_metrics()
+            return
+        self._metrics_task = loop.create_task(self._flush_metrics_loop())
+    
+    async def _flush_metrics_loop(self):
+        """Periodically drain queued metrics"""
+        while True:
+            try:
+                await asyncio.sleep(self.metrics_flush_interval)
+                self.flush_metrics()
+            except asyncio.CancelledError:
+                self.flush_metrics()
+                raise
+            except Exception as e:
+                logger.error("Error in metrics flush loop", exc_info=True)
+    
+    def flush_metrics(self):
+        """Drain queued metrics into SecurityMetrics"""
+        batch = []
+        try:
+            while self._metrics_q:
+                batch.append(self._metrics_q.popleft())
+        except IndexError:
+            pass
+        if batch:
+            SecurityMetrics.bulk_update_api_usage(batch)
+        if self._dropped_since_flush:
+            logger.warning(
+                f"Dropped {self._dropped_since_flush} API usage metrics "
+                f"because the metrics queue was full"
+            )
+            self._dropped_since_flush = 0
+    
+    async def stop_metrics_flush(self):
+        """Stop the metrics flush task and flush remaining metrics"""
+        task, self._metrics_task = self._metrics_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.flush_metrics()
+
+async def stop_metrics_flush_all():
+    """Stop the metrics flush task of every live SecurityManager and flush its queue"""
+    for manager in list(_managers):
+        try:
+            await manager.stop_metrics_flush()
+        except Exception as e:
+            logger.error("Error flushing security metrics on shutdown", exc_info=True)
+
 class SecurityError(Exception):
     """Security-related error"""
     pass 
\ No newline at end of file
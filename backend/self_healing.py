@@ -1,5 +1,6 @@
 import logging
 import asyncio
+import os
 import yaml
 from fastapi import FastAPI, HTTPException
 from .error_handler import ErrorHandler
@@ -10,6 +11,11 @@ from .fallback_strategies import FallbackStrategies
 from .load_balancer import LoadBalancer
 from .cache_manager import CacheManager
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
 class SelfHealingSystem:
@@ -24,14 +30,22 @@ class SelfHealingSystem:
         self.fallback_strategies = FallbackStrategies()
         self.load_balancer = LoadBalancer()
         self.cache_manager = CacheManager()
+        self.config_path = "config/self_healing_config.yaml"
+        self._config_mtime = None
+        self._config_cache = None
         self.config = self._load_config()
         self._setup_routes()
         
     def _load_config(self) -> dict:
-        """Load configuration from YAML file"""
+        """Load configuration from YAML file (cached until the file changes)"""
         try:
-            with open("config/self_healing_config.yaml", "r") as f:
-                return yaml.safe_load(f)
+            mtime = os.stat(self.config_path).st_mtime_ns
+            if self._config_cache is not None and self._config_mtime == mtime:
+                return self._config_cache
+            with open(self.config_path, "rb") as f:
+                self._config_cache = yaml.load(f, Loader=SafeLoader)
+            self._config_mtime = mtime
+            return self._config_cache
         except Exception as e:
             logger.error("Error loading configuration", exc_info=True)
             raise
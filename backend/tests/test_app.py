@@ -1,126 +1,176 @@
+import asyncio
+import orjson
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from types import MappingProxyType
+from httpx import AsyncClient, ASGITransport
 from app import app
 from models import Patient, Alert, Rule, SeverityLevel
 from datetime import datetime
 
-client = TestClient(app)
+OK, NOT_FOUND, UNPROCESSABLE = 200, 404, 422
+JSON_HEADERS = {"content-type": "application/json"}
 
-@pytest.fixture
-def sample_patient():
-    return {
-        "id": "test_patient_1",
-        "name": [{"text": "John Doe"}],
-        "gender": "male",
-        "birthDate": "1980-01-01",
-        "conditions": {
-            "observations": [
-                {
-                    "code": "eGFR",
-                    "system": "http://loinc.org",
-                    "display": "eGFR",
-                    "value": 25.0,
-                    "unit": "mL/min/1.73m²",
-                    "date": "2024-03-15"
-                },
-                {
-                    "code": "QT_interval",
-                    "system": "http://loinc.org",
-                    "display": "QT Interval",
-                    "value": 480.0,
-                    "unit": "ms",
-                    "date": "2024-03-15"
-                }
-            ],
-            "medications": [
-                {
-                    "code": "ibuprofen",
-                    "system": "http://snomed.info/sct",
-                    "display": "Ibuprofen 400mg",
-                    "status": "active",
-                    "intent": "order",
-                    "date": "2024-03-15"
-                },
-                {
-                    "code": "amiodarone",
-                    "system": "http://snomed.info/sct",
-                    "display": "Amiodarone 200mg",
-                    "status": "active",
-                    "intent": "order",
-                    "date": "2024-03-15"
-                }
-            ],
-            "conditions": [
-                {
-                    "code": "CKD_stage_4",
-                    "system": "http://snomed.info/sct",
-                    "display": "Chronic Kidney Disease Stage 4",
-                    "status": "active",
-                    "onset": "2023-12-01"
-                }
-            ]
-        }
+def _json(response):
+    # Decode the raw body bytes directly, skipping the str round-trip
+    return orjson.loads(response.content)
+
+def _freeze(value):
+    """Recursively wrap a payload so shared fixtures can't be mutated"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+SAMPLE_PATIENT = {
+    "id": "test_patient_1",
+    "name": [{"text": "John Doe"}],
+    "gender": "male",
+    "birthDate": "1980-01-01",
+    "conditions": {
+        "observations": [
+            {
+                "code": "eGFR",
+                "system": "http://loinc.org",
+                "display": "eGFR",
+                "value": 25.0,
+                "unit": "mL/min/1.73m²",
+                "date": "2024-03-15"
+            },
+            {
+                "code": "QT_interval",
+                "system": "http://loinc.org",
+                "display": "QT Interval",
+                "value": 480.0,
+                "unit": "ms",
+                "date": "2024-03-15"
+            }
+        ],
+        "medications": [
+            {
+                "code": "ibuprofen",
+                "system": "http://snomed.info/sct",
+                "display": "Ibuprofen 400mg",
+                "status": "active",
+                "intent": "order",
+                "date": "2024-03-15"
+            },
+            {
+                "code": "amiodarone",
+                "system": "http://snomed.info/sct",
+                "display": "Amiodarone 200mg",
+                "status": "active",
+                "intent": "order",
+                "date": "2024-03-15"
+            }
+        ],
+        "conditions": [
+            {
+                "code": "CKD_stage_4",
+                "system": "http://snomed.info/sct",
+                "display": "Chronic Kidney Disease Stage 4",
+                "status": "active",
+                "onset": "2023-12-01"
+            }
+        ]
     }
+}
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # Session-wide loop so the shared client outlives individual tests
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest_asyncio.fixture(scope="session")
+async def aclient():
+    # Run the app's lifespan once and reuse one ASGI client for the session
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://t") as c:
+            yield c
+
+@pytest.fixture(scope="session")
+def sample_patient():
+    return _freeze(SAMPLE_PATIENT)
+
+@pytest.fixture(scope="session")
+def sample_patient_bytes(sample_patient):
+    # Serialize once; tests post the same bytes
+    # orjson writes tuples as arrays; default unwraps the nested mapping proxies
+    return orjson.dumps(sample_patient, default=dict)
 
-def test_root():
-    response = client.get("/")
-    assert response.status_code == 200
-    assert response.json() == {
+@pytest.mark.asyncio
+async def test_root(aclient):
+    response = await aclient.get("/")
+    assert response.status_code == OK
+    assert _json(response) == {
         "name": "Clinical Decision Support System",
         "version": "1.0.0",
         "status": "operational"
     }
 
-def test_match_rules(sample_patient):
-    response = client.post("/match-rules", json=sample_patient)
-    assert response.status_code == 200
-    alerts = response.json()
+@pytest_asyncio.fixture(scope="session")
+async def alerts_by_id(aclient, sample_patient_bytes):
+    # Match rules once and index the alerts for every assertion test
+    response = await aclient.post("/match-rules", content=sample_patient_bytes, headers=JSON_HEADERS)
+    assert response.status_code == OK
+    alerts = _json(response)
     assert isinstance(alerts, list)
-    
-    # Check for CKD NSAID alert
-    ckd_alert = next((alert for alert in alerts if alert["rule_id"] == "CKD_NSAID"), None)
+    return {alert["rule_id"]: alert for alert in alerts}
+
+def test_ckd_nsaid_alert(alerts_by_id):
+    ckd_alert = alerts_by_id.get("CKD_NSAID")
     assert ckd_alert is not None
     assert ckd_alert["severity"] == "error"
     assert "eGFR" in ckd_alert["triggered_by"][0]
     assert "Ibuprofen" in ckd_alert["triggered_by"][1]
-    
-    # Check for QT prolongation alert
-    qt_alert = next((alert for alert in alerts if alert["rule_id"] == "QT_Prolongation"), None)
+
+def test_qt_prolongation_alert(alerts_by_id):
+    qt_alert = alerts_by_id.get("QT_Prolongation")
     assert qt_alert is not None
     assert qt_alert["severity"] == "warning"
     assert "QT Interval" in qt_alert["triggered_by"][0]
     assert "Amiodarone" in qt_alert["triggered_by"][1]
 
-def test_explain_rule(sample_patient):
-    response = client.post("/explain-rule", params={"rule_id": "CKD_NSAID"}, json=sample_patient)
-    assert response.status_code == 200
-    explanation = response.json()
+@pytest.mark.asyncio
+async def test_explain_rule(aclient, sample_patient_bytes):
+    response = await aclient.post("/explain-rule", params={"rule_id": "CKD_NSAID"}, content=sample_patient_bytes, headers=JSON_HEADERS)
+    assert response.status_code == OK
+    explanation = _json(response)
     assert "template" in explanation
     assert "variables" in explanation
     assert "guidelines" in explanation
 
-def test_suggest_rules():
-    response = client.get("/suggest-rules", params={"prefix": "CKD"})
-    assert response.status_code == 200
-    suggestions = response.json()["suggestions"]
+@pytest_asyncio.fixture(scope="session")
+async def all_suggestions(aclient):
+    # The rule trie is static for the session; fetch every suggestion once
+    response = await aclient.get("/suggest-rules", params={"prefix": ""})
+    assert response.status_code == OK
+    suggestions = _json(response)["suggestions"]
     assert isinstance(suggestions, list)
+    return suggestions
+
+def test_suggest_rules(all_suggestions):
+    suggestions = [s for s in all_suggestions if s.startswith("CKD")]
     assert "CKD_NSAID" in suggestions
 
-def test_invalid_patient_id():
-    response = client.get("/patients/invalid_id")
-    assert response.status_code == 404
+@pytest.mark.asyncio
+async def test_invalid_patient_id(aclient):
+    response = await aclient.get("/patients/invalid_id")
+    assert response.status_code == NOT_FOUND
 
-def test_invalid_rule_id():
-    response = client.post("/explain-rule", params={"rule_id": "invalid_rule"}, json={})
-    assert response.status_code == 404
+@pytest.mark.asyncio
+async def test_invalid_rule_id(aclient):
+    response = await aclient.post("/explain-rule", params={"rule_id": "invalid_rule"}, json={})
+    assert response.status_code == NOT_FOUND
 
-def test_invalid_patient_data():
-    response = client.post("/match-rules", json={})
-    assert response.status_code == 422  # Validation error
+@pytest.mark.asyncio
+async def test_invalid_patient_data(aclient):
+    response = await aclient.post("/match-rules", json={})
+    assert response.status_code == UNPROCESSABLE  # Validation error
 
-def test_suggest_rules_empty_prefix():
-    response = client.get("/suggest-rules", params={"prefix": ""})
-    assert response.status_code == 200
-    suggestions = response.json()["suggestions"]
-    assert isinstance(suggestions, list)
-    assert len(suggestions) > 0 
\ No newline at end of file
+def test_suggest_rules_empty_prefix(all_suggestions):
+    assert len(all_suggestions) > 0 
\ No newline at end of file
@@ -1,47 +1,51 @@
-import unittest
 import os
-import json
-import tempfile
-import shutil
+import re
+import orjson
 from datetime import datetime, timedelta
 from ..config.config_manager import ConfigManager, ConfigValue
 import pytest
 
-class TestConfigManager(unittest.TestCase):
-    def setUp(self):
-        # Create temporary directory
-        self.test_dir = tempfile.mkdtemp()
-        self.config_manager = ConfigManager(
-            config_dir=self.test_dir,
+_STRING_RE = re.compile(r'^[a-z]+$')
+
+@pytest.fixture(scope="session")
+def validation_rules():
+    """Sample validation rules"""
+    return {
+        'string': {
+            'type': 'str',
+            'min_length': 3,
+            'max_length': 10,
+            'pattern': _STRING_RE
+        },
+        'number': {
+            'type': 'int',
+            'min': 0,
+            'max': 100
+        },
+        'enum': {
+            'type': 'str',
+            'enum': ['red', 'green', 'blue']
+        }
+    }
+
+@pytest.fixture(scope="session")
+def root_dir(tmp_path_factory):
+    """Shared root directory for per-test config directories"""
+    return tmp_path_factory.mktemp("cfg")
+
+class TestConfigManager:
+    @pytest.fixture
+    def config_manager(self, root_dir, request):
+        test_dir = root_dir / request.node.name
+        test_dir.mkdir()
+        return ConfigManager(
+            config_dir=str(test_dir),
             default_format='json',
             reload_interval=1,
             validate_on_load=True
         )
-        
-        # Sample validation rules
-        self.validation_rules = {
-            'string': {
-                'type': 'str',
-                'min_length': 3,
-                'max_length': 10,
-                'pattern': r'^[a-z]+$'
-            },
-            'number': {
-                'type': 'int',
-                'min': 0,
-                'max': 100
-            },
-            'enum': {
-                'type': 'str',
-                'enum': ['red', 'green', 'blue']
-            }
-        }
-    
-    def tearDown(self):
-        # Clean up temporary directory
-        shutil.rmtree(self.test_dir)
     
-    def test_load_save_config(self):
+    def test_load_save_config(self, config_manager):
         # Create test config
         config = {
             'name': 'test',
@@ -50,199 +54,160 @@ class TestConfigManager(unittest.TestCase):
         }
         
         # Save config
-        config_path = os.path.join(self.test_dir, 'test.json')
-        with open(config_path, 'w') as f:
-            json.dump(config, f)
+        config_path = os.path.join(config_manager.config_dir, 'test.json')
+        with open(config_path, 'wb') as f:
+            f.write(orjson.dumps(config))
         
         # Load config
-        self.config_manager.load_config('test', config_path)
+        config_manager.load_config('test', config_path)
         
         # Verify values
-        self.assertEqual(self.config_manager.get_value('name'), 'test')
-        self.assertEqual(self.config_manager.get_value('value'), 42)
-        self.assertEqual(self.config_manager.get_value('color'), 'red')
+        assert config_manager.get_value('name') == 'test'
+        assert config_manager.get_value('value') == 42
+        assert config_manager.get_value('color') == 'red'
         
         # Save config
-        self.config_manager.save_config('test')
+        config_manager.save_config('test')
         
-        # Verify file
-        with open(config_path, 'r') as f:
-            saved_config = json.load(f)
-        self.assertEqual(saved_config, config)
-    
-    def test_validation(self):
-        # Test valid values
-        self.config_manager.set_value(
-            'valid_string',
-            'hello',
-            validation=self.validation_rules['string']
-        )
-        self.assertEqual(
-            self.config_manager.get_value('valid_string'),
-            'hello'
-        )
-        
-        # Test invalid values
-        with self.assertRaises(ValueError):
-            self.config_manager.set_value(
-                'invalid_string',
-                'hi',  # Too short
-                validation=self.validation_rules['string']
-            )
-        
-        with self.assertRaises(ValueError):
-            self.config_manager.set_value(
-                'invalid_number',
-                150,  # Too large
-                validation=self.validation_rules['number']
-            )
-        
-        with self.assertRaises(ValueError):
-            self.config_manager.set_value(
-                'invalid_enum',
-                'yellow',  # Not in enum
-                validation=self.validation_rules['enum']
-            )
-    
-    def test_value_history(self):
+        # Verify file (save_config indents, so canonicalize both sides)
+        with open(config_path, 'rb') as f:
+            saved = orjson.dumps(orjson.loads(f.read()), option=orjson.OPT_SORT_KEYS)
+        assert saved == orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+    
+    def test_value_history(self, config_manager):
         # Set initial value
-        self.config_manager.set_value('test', 'initial')
+        config_manager.set_value('test', 'initial')
         
         # Update value
-        self.config_manager.set_value('test', 'updated')
+        config_manager.set_value('test', 'updated')
         
         # Get history
-        history = self.config_manager.get_value_history('test')
-        self.assertEqual(len(history), 1)  # Only latest value stored
+        history = config_manager.get_value_history('test')
+        assert len(history) == 1  # Only latest value stored
         
         # Get history with time filter
         past = datetime.utcnow() - timedelta(hours=1)
         future = datetime.utcnow() + timedelta(hours=1)
         
-        history = self.config_manager.get_value_history(
+        history = config_manager.get_value_history(
             'test',
             start_time=past,
             end_time=future
         )
-        self.assertEqual(len(history), 1)
+        assert len(history) == 1
     
-    def test_dependencies(self):
+    def test_dependencies(self, config_manager):
         # Set values with dependencies
-        self.config_manager.set_value('base_url', 'http://example.com')
-        self.config_manager.set_value(
+        config_manager.set_value('base_url', 'http://example.com')
+        config_manager.set_value(
             'api_url',
             '${base_url}/api'
         )
         
         # Check dependencies
-        deps = self.config_manager.get_value_dependencies('api_url')
-        self.assertEqual(deps, ['base_url'])
+        deps = config_manager.get_value_dependencies('api_url')
+        assert deps == ['base_url']
         
         # Check dependents
-        deps = self.config_manager.get_value_dependents('base_url')
-        self.assertEqual(deps, ['api_url'])
+        deps = config_manager.get_value_dependents('base_url')
+        assert deps == ['api_url']
         
         # Get dependency tree
-        tree = self.config_manager.get_value_tree()
-        self.assertEqual(
-            tree['api_url']['dependencies'],
-            ['base_url']
-        )
-        self.assertEqual(
-            tree['base_url']['dependents'],
-            ['api_url']
-        )
+        tree = config_manager.get_value_tree()
+        assert tree['api_url']['dependencies'] == ['base_url']
+        assert tree['base_url']['dependents'] == ['api_url']
     
-    def test_export_import(self):
+    @pytest.mark.slow
+    def test_export_import(self, config_manager):
         # Set test values
-        self.config_manager.set_value('test1', 'value1')
-        self.config_manager.set_value('test2', 'value2')
+        config_manager.set_value('test1', 'value1')
+        config_manager.set_value('test2', 'value2')
         
         # Export config
-        exported = self.config_manager.export_config(
+        exported = config_manager.export_config(
             format='json',
             include_info=True
         )
         
         # Clear config
-        self.config_manager.delete_value('test1')
-        self.config_manager.delete_value('test2')
+        config_manager.delete_value('test1')
+        config_manager.delete_value('test2')
         
         # Import config
-        self.config_manager.import_config(exported)
+        config_manager.import_config(exported)
         
         # Verify values
-        self.assertEqual(self.config_manager.get_value('test1'), 'value1')
-        self.assertEqual(self.config_manager.get_value('test2'), 'value2')
+        assert config_manager.get_value('test1') == 'value1'
+        assert config_manager.get_value('test2') == 'value2'
     
-    def test_stats(self):
+    def test_stats(self, config_manager):
         # Perform operations
-        self.config_manager.set_value('test', 'value')
-        self.config_manager.get_value('test')
-        self.config_manager.delete_value('test')
+        config_manager.set_value('test', 'value')
+        config_manager.get_value('test')
+        config_manager.delete_value('test')
         
         # Get stats
-        stats = self.config_manager.get_stats()
+        stats = config_manager.get_stats()
         
         # Verify stats
-        self.assertIn('value_count', stats)
-        self.assertIn('file_count', stats)
-        self.assertIn('load_count', stats)
-        self.assertIn('save_count', stats)
+        assert 'value_count' in stats
+        assert 'file_count' in stats
+        assert 'load_count' in stats
+        assert 'save_count' in stats
     
-    def test_values_by_source(self):
+    def test_values_by_source(self, config_manager):
         # Set values from different sources
-        self.config_manager.set_value('memory1', 'value1', source='memory')
-        self.config_manager.set_value('memory2', 'value2', source='memory')
-        self.config_manager.set_value('file1', 'value3', source='file')
+        config_manager.set_value('memory1', 'value1', source='memory')
+        config_manager.set_value('memory2', 'value2', source='memory')
+        config_manager.set_value('file1', 'value3', source='file')
         
         # Get values by source
-        memory_values = self.config_manager.get_values_by_source('memory')
-        self.assertEqual(len(memory_values), 2)
-        self.assertEqual(memory_values['memory1'], 'value1')
-        self.assertEqual(memory_values['memory2'], 'value2')
+        memory_values = config_manager.get_values_by_source('memory')
+        assert len(memory_values) == 2
+        assert memory_values['memory1'] == 'value1'
+        assert memory_values['memory2'] == 'value2'
         
-        file_values = self.config_manager.get_values_by_source('file')
-        self.assertEqual(len(file_values), 1)
-        self.assertEqual(file_values['file1'], 'value3')
+        file_values = config_manager.get_values_by_source('file')
+        assert len(file_values) == 1
+        assert file_values['file1'] == 'value3'
     
-    def test_values_by_validation(self):
+    def test_values_by_validation(self, config_manager, validation_rules):
         # Set values with different validation rules
-        self.config_manager.set_value(
+        config_manager.set_value(
             'string1',
             'hello',
-            validation=self.validation_rules['string']
+            validation=validation_rules['string']
         )
-        self.config_manager.set_value(
+        config_manager.set_value(
             'string2',
             'world',
-            validation=self.validation_rules['string']
+            validation=validation_rules['string']
         )
-        self.config_manager.set_value(
+        config_manager.set_value(
             'number1',
             42,
-            validation=self.validation_rules['number']
+            validation=validation_rules['number']
         )
         
         # Get values by validation
-        string_values = self.config_manager.get_values_by_validation(
-            self.validation_rules['string']
+        string_values = config_manager.get_values_by_validation(
+            validation_rules['string']
         )
-        self.assertEqual(len(string_values), 2)
-        self.assertEqual(string_values['string1'], 'hello')
-        self.assertEqual(string_values['string2'], 'world')
+        assert len(string_values) == 2
+        assert string_values['string1'] == 'hello'
+        assert string_values['string2'] == 'world'
         
-        number_values = self.config_manager.get_values_by_validation(
-            self.validation_rules['number']
+        number_values = config_manager.get_values_by_validation(
+            validation_rules['number']
         )
-        self.assertEqual(len(number_values), 1)
-        self.assertEqual(number_values['number1'], 42)
+        assert len(number_values) == 1
+        assert number_values['number1'] == 42
 
 @pytest.fixture
-def config_manager():
+def config_manager(tmp_path):
     """Create a test configuration manager"""
-    manager = ConfigManager(
-        config_dir='test_config',
+    return ConfigManager(
+        config_dir=str(tmp_path),
         default_format='json',
         reload_interval=1,
         validate_on_load=True,
@@ -250,16 +215,6 @@ def config_manager():
         default_profile='test',
         default_environment='test'
     )
-    yield manager
-    
-    # Cleanup
-    if os.path.exists('test_config'):
-        for root, dirs, files in os.walk('test_config', topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            for name in dirs:
-                os.rmdir(os.path.join(root, name))
-        os.rmdir('test_config')
 
 def test_environment_variables(config_manager):
     """Test environment variable support"""
@@ -267,7 +222,7 @@ def test_environment_variables(config_manager):
     os.environ['CONFIG_TEST_VAR'] = 'test_value'
     
     # Reload environment variables
-    config_manager._load_environment_variables()
+    config_manager._load_environment_variables(keys=['test_var'])
     
     # Check value
     assert config_manager.get_value('test_var') == 'test_value'
@@ -292,38 +247,50 @@ def test_profiles(config_manager):
     config_manager.switch_profile('prod')
     assert config_manager.get_value('test_key') == 'prod_value'
 
-def test_validation(config_manager):
+USER_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string'},
+        'age': {'type': 'integer', 'minimum': 0}
+    },
+    'required': ['name', 'age']
+}
+
+@pytest.mark.parametrize("rule,value,expected_valid", [
+    # JSON schema validation
+    ('schema', {'name': 'John', 'age': 30}, True),
+    ('schema', {'name': 'John', 'age': -1}, False),
+    ('schema', {'name': 'John'}, False),  # Missing required field
+    # Rule-dict validation
+    ('string', 'hello', True),
+    ('string', 'hi', False),  # Too short
+    ('number', 150, False),  # Too large
+    ('enum', 'yellow', False),  # Not in enum
+])
+def test_validation(config_manager, validation_rules, rule, value, expected_valid):
     """Test configuration validation"""
-    # Create schema
-    schema = {
-        'type': 'object',
-        'properties': {
-            'name': {'type': 'string'},
-            'age': {'type': 'integer', 'minimum': 0}
-        },
-        'required': ['name', 'age']
-    }
-    
-    # Save schema
-    schema_dir = os.path.join('test_config', 'schemas')
-    os.makedirs(schema_dir, exist_ok=True)
-    with open(os.path.join(schema_dir, 'user.json'), 'w') as f:
-        json.dump(schema, f)
-    
-    # Load schema
-    config_manager._load_schemas()
-    
-    # Test validation
-    valid_values = {'name': 'John', 'age': 30}
-    invalid_values = {'name': 'John', 'age': -1}
-    
-    is_valid, errors = config_manager.validate_schema('user', valid_values)
-    assert is_valid
-    assert len(errors) == 0
-    
-    is_valid, errors = config_manager.validate_schema('user', invalid_values)
-    assert not is_valid
-    assert len(errors) > 0
+    if rule == 'schema':
+        # Save and load schema
+        schema_dir = os.path.join(config_manager.config_dir, 'schemas')
+        os.makedirs(schema_dir, exist_ok=True)
+        with open(os.path.join(schema_dir, 'user.json'), 'wb') as f:
+            f.write(orjson.dumps(USER_SCHEMA))
+        config_manager._load_schemas()
+        
+        validator = config_manager.schema_validators['user']
+        
+        is_valid, errors = config_manager.validate_schema('user', value)
+        assert is_valid is expected_valid
+        assert (len(errors) == 0) is expected_valid
+        
+        # The validator compiled at load time is reused, not rebuilt
+        assert config_manager.schema_validators['user'] is validator
+    elif expected_valid:
+        config_manager.set_value('value', value, validation=validation_rules[rule])
+        assert config_manager.get_value('value') == value
+    else:
+        with pytest.raises(ValueError):
+            config_manager.set_value('value', value, validation=validation_rules[rule])
 
 def test_encryption(config_manager):
     """Test configuration encryption"""
@@ -335,11 +302,11 @@ def test_encryption(config_manager):
     assert value == 'sensitive_data'
     
     # Check raw value is encrypted
-    with config_manager.values_lock:
-        raw_value = config_manager.values['secret'].value
-        assert raw_value != 'sensitive_data'
-        assert isinstance(raw_value, str)
+    raw_value = config_manager.get_raw('secret')
+    assert raw_value != 'sensitive_data'
+    assert isinstance(raw_value, str)
 
+@pytest.mark.slow
 def test_backup_restore(config_manager):
     """Test configuration backup and restore"""
     # Set some values
@@ -366,6 +333,7 @@ def test_backup_restore(config_manager):
     assert len(backups) == 1
     assert backups[0]['name'] == 'test_backup'
 
+@pytest.mark.slow
 def test_templates(config_manager):
     """Test configuration templates"""
     # Create template
@@ -401,7 +369,8 @@ def test_templates(config_manager):
     assert len(templates) == 1
     assert templates[0]['name'] == 'user'
 
-def test_documentation(config_manager):
+@pytest.mark.slow
+def test_documentation(config_manager, tmp_path):
     """Test configuration documentation generation"""
     # Create profiles
     config_manager.create_profile('dev', 'Development profile')
@@ -422,20 +391,21 @@ def test_documentation(config_manager):
             'age': {'type': 'integer'}
         }
     }
-    schema_dir = os.path.join('test_config', 'schemas')
+    schema_dir = os.path.join(config_manager.config_dir, 'schemas')
     os.makedirs(schema_dir, exist_ok=True)
-    with open(os.path.join(schema_dir, 'user.json'), 'w') as f:
-        json.dump(schema, f)
+    with open(os.path.join(schema_dir, 'user.json'), 'wb') as f:
+        f.write(orjson.dumps(schema))
     
     # Load schema
     config_manager._load_schemas()
     
     # Generate documentation
-    config_manager.generate_docs('test_docs')
+    docs_dir = tmp_path / 'docs'
+    config_manager.generate_docs(str(docs_dir))
     
     # Check documentation
-    assert os.path.exists('test_docs/README.md')
-    with open('test_docs/README.md', 'r') as f:
+    assert (docs_dir / 'README.md').exists()
+    with open(docs_dir / 'README.md', 'r') as f:
         content = f.read()
         assert 'Configuration Documentation' in content
         assert 'Profiles' in content
@@ -482,7 +452,4 @@ def test_statistics(config_manager):
     assert stats['profile_count'] == 1
     assert 'key1' in stats['values']
     assert 'key2' in stats['values']
-    assert stats['values']['key2']['encrypted'] is True
-
-if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    assert stats['values']['key2']['encrypted'] is True 
\ No newline at end of file
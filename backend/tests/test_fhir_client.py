@@ -1,32 +1,66 @@
+import asyncio
 import pytest
-from unittest.mock import patch, AsyncMock
+from types import MappingProxyType
+from unittest.mock import patch, AsyncMock, MagicMock
 from fhir_client import FHIRClient
-from models import Patient, Observation, Medication, Condition
+from datetime import datetime
+from models import Patient, PatientConditions, Observation, Medication, Condition
+
+def _freeze(value):
+    """Recursively wrap a payload so shared fixtures can't be mutated"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _set_json(mock_session, payload, status=200):
+    """Configure the mocked GET response status and JSON body"""
+    response = mock_session.get.return_value.__aenter__.return_value
+    response.status = status
+    response.json = AsyncMock(return_value=payload)
+    return response
 
 @pytest.fixture
 def mock_session():
     with patch('aiohttp.ClientSession') as mock:
         session = AsyncMock()
         mock.return_value.__aenter__.return_value = session
+        _set_json(session, None)
         yield session
 
 @pytest.fixture
 def fhir_client(mock_session):
     return FHIRClient()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fhir_patient():
-    return {
+    return _freeze({
         "resourceType": "Patient",
         "id": "test_patient_1",
         "name": [{"text": "John Doe"}],
         "gender": "male",
         "birthDate": "1980-01-01"
-    }
+    })
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_patient_model():
+    # Shape-valid Patient built without running validators
+    return Patient.model_construct(
+        id="test_patient_1",
+        name=[{"text": "John Doe"}],
+        gender="male",
+        birthDate=datetime(1980, 1, 1),
+        conditions=PatientConditions.model_construct(
+            observations=[],
+            medications=[],
+            conditions=[]
+        )
+    )
+
+@pytest.fixture(scope="session")
 def sample_fhir_observations():
-    return {
+    return _freeze({
         "resourceType": "Bundle",
         "entry": [
             {
@@ -47,11 +81,11 @@ def sample_fhir_observations():
                 }
             }
         ]
-    }
+    })
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fhir_medications():
-    return {
+    return _freeze({
         "resourceType": "Bundle",
         "entry": [
             {
@@ -70,11 +104,11 @@ def sample_fhir_medications():
                 }
             }
         ]
-    }
+    })
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fhir_conditions():
-    return {
+    return _freeze({
         "resourceType": "Bundle",
         "entry": [
             {
@@ -96,13 +130,11 @@ def sample_fhir_conditions():
                 }
             }
         ]
-    }
+    })
 
 @pytest.mark.asyncio
 async def test_get_patient(fhir_client, mock_session, sample_fhir_patient):
-    mock_session.get.return_value.__aenter__.return_value.json = AsyncMock(
-        return_value=sample_fhir_patient
-    )
+    _set_json(mock_session, sample_fhir_patient)
     
     patient = await fhir_client.get_patient("test_patient_1")
     assert isinstance(patient, Patient)
@@ -111,9 +143,17 @@ async def test_get_patient(fhir_client, mock_session, sample_fhir_patient):
     assert patient.gender == "male"
     assert patient.birthDate == "1980-01-01"
 
+@pytest.mark.asyncio
+async def test_get_patient_cached(fhir_client, mock_session, sample_patient_model):
+    fhir_client.cache["patient_test_patient_1"] = sample_patient_model
+    
+    patient = await fhir_client.get_patient("test_patient_1")
+    assert patient is sample_patient_model
+    assert mock_session.get.call_count == 0
+
 @pytest.mark.asyncio
 async def test_get_patient_not_found(fhir_client, mock_session):
-    mock_session.get.return_value.__aenter__.return_value.status = 404
+    _set_json(mock_session, None, status=404)
     
     with pytest.raises(Exception) as exc_info:
         await fhir_client.get_patient("nonexistent_patient")
@@ -121,9 +161,7 @@ async def test_get_patient_not_found(fhir_client, mock_session):
 
 @pytest.mark.asyncio
 async def test_get_patient_observations(fhir_client, mock_session, sample_fhir_observations):
-    mock_session.get.return_value.__aenter__.return_value.json = AsyncMock(
-        return_value=sample_fhir_observations
-    )
+    _set_json(mock_session, sample_fhir_observations)
     
     observations = await fhir_client._fetch_observations("test_patient_1")
     assert len(observations) == 1
@@ -132,9 +170,7 @@ async def test_get_patient_observations(fhir_client, mock_session, sample_fhir_o
 
 @pytest.mark.asyncio
 async def test_get_patient_medications(fhir_client, mock_session, sample_fhir_medications):
-    mock_session.get.return_value.__aenter__.return_value.json = AsyncMock(
-        return_value=sample_fhir_medications
-    )
+    _set_json(mock_session, sample_fhir_medications)
     
     medications = await fhir_client._fetch_medications("test_patient_1")
     assert len(medications) == 1
@@ -143,9 +179,7 @@ async def test_get_patient_medications(fhir_client, mock_session, sample_fhir_me
 
 @pytest.mark.asyncio
 async def test_get_patient_conditions(fhir_client, mock_session, sample_fhir_conditions):
-    mock_session.get.return_value.__aenter__.return_value.json = AsyncMock(
-        return_value=sample_fhir_conditions
-    )
+    _set_json(mock_session, sample_fhir_conditions)
     
     conditions = await fhir_client._fetch_conditions("test_patient_1")
     assert len(conditions) == 1
@@ -155,17 +189,48 @@ async def test_get_patient_conditions(fhir_client, mock_session, sample_fhir_con
 @pytest.mark.asyncio
 async def test_process_patient_data(fhir_client, sample_fhir_patient, sample_fhir_observations,
                                   sample_fhir_medications, sample_fhir_conditions):
-    mock_session = AsyncMock()
-    mock_session.get.return_value.__aenter__.return_value.json = AsyncMock(side_effect=[
-        sample_fhir_patient,
-        sample_fhir_observations,
-        sample_fhir_medications,
-        sample_fhir_conditions
-    ])
+    payloads = {
+        "Patient": sample_fhir_patient,
+        "Observation": sample_fhir_observations,
+        "MedicationRequest": sample_fhir_medications,
+        "Condition": sample_fhir_conditions
+    }
+    events = []
+    
+    class _Response:
+        """Async context manager that yields once so overlap is observable"""
+        status = 200
+        
+        def __init__(self, resource_type):
+            self.resource_type = resource_type
+        
+        async def __aenter__(self):
+            events.append(("start", self.resource_type))
+            await asyncio.sleep(0)
+            events.append(("end", self.resource_type))
+            return self
+        
+        async def __aexit__(self, *exc_info):
+            return False
+        
+        async def json(self):
+            return payloads[self.resource_type]
+    
+    def fake_get(url, params=None):
+        path = url[len(fhir_client.settings['api_base']) + 1:]
+        return _Response(path.split("/")[0])
+    
+    mock_session = MagicMock()
+    mock_session.get.side_effect = fake_get
     
     with patch('aiohttp.ClientSession', return_value=mock_session):
         patient_data = await fhir_client.get_patient("test_patient_1")
         
+        # Patient first, then all three sub-resources dispatched before any returns
+        assert mock_session.get.call_count == 4
+        assert events[:2] == [("start", "Patient"), ("end", "Patient")]
+        assert [event for event, _ in events[2:5]] == ["start", "start", "start"]
+        
         assert len(patient_data.conditions.observations) == 1
         assert len(patient_data.conditions.medications) == 1
         assert len(patient_data.conditions.conditions) == 1
@@ -187,7 +252,7 @@ async def test_process_patient_data(fhir_client, sample_fhir_patient, sample_fhi
 
 @pytest.mark.asyncio
 async def test_fhir_client_error_handling(fhir_client, mock_session):
-    mock_session.get.return_value.__aenter__.return_value.status = 500
+    _set_json(mock_session, None, status=500)
     
     with pytest.raises(Exception) as exc_info:
         await fhir_client.get_patient("test_patient_1")
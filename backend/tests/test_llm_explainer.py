@@ -1,11 +1,66 @@
+import asyncio
+import json
 import pytest
-from unittest.mock import patch, AsyncMock
-from llm_explainer import LLMExplainer
+from aioresponses import aioresponses
+from tenacity import wait_none
+from llm_explainer import LLMExplainer, EXPLANATION_MAX_TOKENS, MAX_COMPLETION_TOKENS
 from models import Patient, RuleExplanation
 
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+class OpenAIStub:
+    """Transport-level stub for the OpenAI chat completions endpoint"""
+    
+    def __init__(self, mocked: aioresponses):
+        self.mocked = mocked
+    
+    def set_response(self, content=None, status=200, exception=None, payload=None, headers=None):
+        """Replace the canned response returned for every chat completion"""
+        self.reset()
+        self.add_response(content, status, exception, payload, headers, repeat=True)
+    
+    def add_response(self, content=None, status=200, exception=None, payload=None, headers=None, repeat=False):
+        """Queue a response that is served once, ahead of any later registrations"""
+        if payload is None:
+            payload = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ]
+            }
+        self.mocked.post(
+            OPENAI_CHAT_URL, status=status, payload=payload, exception=exception, headers=headers, repeat=repeat
+        )
+    
+    def reset(self):
+        """Drop registered responses and the recorded request history"""
+        self.mocked.clear()
+        self.mocked.requests.clear()
+    
+    @property
+    def call_count(self):
+        return sum(len(calls) for calls in self.mocked.requests.values())
+
+@pytest.fixture(scope="module")
+def mock_openai():
+    # One interception layer for the whole module instead of a patch() per test
+    with aioresponses() as mocked:
+        yield OpenAIStub(mocked)
+
 @pytest.fixture
 def llm_explainer():
-    return LLMExplainer()
+    explainer = LLMExplainer()
+    # pytest.ini sets OPENAI_API_KEY, so transient errors are retried; don't sleep between tries
+    explainer.retry_wait = wait_none()
+    return explainer
+
+@pytest.fixture
+def keyed_explainer(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    explainer = LLMExplainer(max_attempts=3)
+    explainer.retry_wait = wait_none()
+    return explainer
 
 @pytest.fixture
 def sample_patient():
@@ -94,32 +149,24 @@ def sample_rule():
     }
 
 @pytest.mark.asyncio
-async def test_explain_with_llm(llm_explainer, sample_patient, sample_rule):
-    with patch('openai.ChatCompletion.create') as mock_create:
-        mock_create.return_value = AsyncMock(
-            choices=[
-                AsyncMock(
-                    message=AsyncMock(
-                        content="Based on the patient's eGFR of 25 mL/min/1.73m² and active use of Ibuprofen, this patient is at high risk for acute kidney injury. NSAIDs should be discontinued and alternative pain management should be considered."
-                    )
-                )
-            ]
-        )
-        
-        explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
-        assert isinstance(explanation, RuleExplanation)
-        assert explanation.template == sample_rule["actions"][0]["explanation"]["template"]
-        assert len(explanation.variables) == 5
-        assert len(explanation.guidelines) == 2
+async def test_explain_with_llm(llm_explainer, mock_openai, sample_patient, sample_rule):
+    mock_openai.set_response(
+        content="Based on the patient's eGFR of 25 mL/min/1.73m² and active use of Ibuprofen, this patient is at high risk for acute kidney injury. NSAIDs should be discontinued and alternative pain management should be considered."
+    )
+    explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
+    assert isinstance(explanation, RuleExplanation)
+    assert explanation.template == sample_rule["actions"][0]["explanation"]["template"]
+    assert len(explanation.variables) == 5
+    assert len(explanation.guidelines) == 2
 
 @pytest.mark.asyncio
-async def test_explain_with_template(llm_explainer, sample_patient, sample_rule):
-    with patch('openai.ChatCompletion.create', side_effect=Exception("API Error")):
-        explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
-        assert isinstance(explanation, RuleExplanation)
-        assert explanation.template == sample_rule["actions"][0]["explanation"]["template"]
-        assert len(explanation.variables) == 5
-        assert len(explanation.guidelines) == 2
+async def test_explain_with_template(llm_explainer, mock_openai, sample_patient, sample_rule):
+    mock_openai.set_response(status=500, payload={"error": {"message": "API Error"}})
+    explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
+    assert isinstance(explanation, RuleExplanation)
+    assert explanation.template == sample_rule["actions"][0]["explanation"]["template"]
+    assert len(explanation.variables) == 5
+    assert len(explanation.guidelines) == 2
 
 @pytest.mark.asyncio
 async def test_explain_invalid_rule_id(llm_explainer, sample_patient):
@@ -134,46 +181,120 @@ async def test_explain_missing_patient_data(llm_explainer, sample_rule):
     assert "Invalid patient data" in str(exc_info.value)
 
 @pytest.mark.asyncio
-async def test_explain_llm_api_error(llm_explainer, sample_patient, sample_rule):
-    with patch('openai.ChatCompletion.create', side_effect=Exception("API Error")):
-        explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
-        assert isinstance(explanation, RuleExplanation)
-        assert "template" in explanation.dict()
-        assert "variables" in explanation.dict()
-        assert "guidelines" in explanation.dict()
+async def test_explain_llm_api_error(llm_explainer, mock_openai, sample_patient, sample_rule):
+    mock_openai.set_response(status=500, payload={"error": {"message": "API Error"}})
+    explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
+    assert isinstance(explanation, RuleExplanation)
+    assert "template" in explanation.dict()
+    assert "variables" in explanation.dict()
+    assert "guidelines" in explanation.dict()
 
 @pytest.mark.asyncio
-async def test_explain_llm_timeout(llm_explainer, sample_patient, sample_rule):
-    with patch('openai.ChatCompletion.create', side_effect=TimeoutError("API Timeout")):
-        explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
-        assert isinstance(explanation, RuleExplanation)
-        assert "template" in explanation.dict()
-        assert "variables" in explanation.dict()
-        assert "guidelines" in explanation.dict()
+async def test_explain_llm_timeout(llm_explainer, mock_openai, sample_patient, sample_rule):
+    mock_openai.set_response(exception=asyncio.TimeoutError("API Timeout"))
+    explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
+    assert isinstance(explanation, RuleExplanation)
+    assert "template" in explanation.dict()
+    assert "variables" in explanation.dict()
+    assert "guidelines" in explanation.dict()
 
 @pytest.mark.asyncio
-async def test_explain_llm_rate_limit(llm_explainer, sample_patient, sample_rule):
-    with patch('openai.ChatCompletion.create', side_effect=Exception("Rate limit exceeded")):
-        explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
-        assert isinstance(explanation, RuleExplanation)
-        assert "template" in explanation.dict()
-        assert "variables" in explanation.dict()
-        assert "guidelines" in explanation.dict()
+async def test_explain_llm_rate_limit(llm_explainer, mock_openai, sample_patient, sample_rule):
+    mock_openai.set_response(status=429, payload={"error": {"message": "Rate limit exceeded"}})
+    explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
+    assert isinstance(explanation, RuleExplanation)
+    assert "template" in explanation.dict()
+    assert "variables" in explanation.dict()
+    assert "guidelines" in explanation.dict()
 
 @pytest.mark.asyncio
-async def test_explain_llm_invalid_response(llm_explainer, sample_patient, sample_rule):
-    with patch('openai.ChatCompletion.create') as mock_create:
-        mock_create.return_value = AsyncMock(
-            choices=[
-                AsyncMock(
-                    message=AsyncMock(
-                        content=None
-                    )
-                )
-            ]
-        )
-        explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
-        assert isinstance(explanation, RuleExplanation)
-        assert "template" in explanation.dict()
-        assert "variables" in explanation.dict()
-        assert "guidelines" in explanation.dict() 
\ No newline at end of file
+async def test_explain_llm_invalid_response(llm_explainer, mock_openai, sample_patient, sample_rule):
+    mock_openai.set_response(content=None)
+    explanation = await llm_explainer.explain("CKD_NSAID", sample_patient)
+    assert isinstance(explanation, RuleExplanation)
+    assert "template" in explanation.dict()
+    assert "variables" in explanation.dict()
+    assert "guidelines" in explanation.dict()
+
+@pytest.mark.asyncio
+async def test_concurrent_explains_share_one_request(monkeypatch, mock_openai, sample_patient):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    explainer = LLMExplainer()
+    mock_openai.set_response(content=json.dumps([f"Explanation {i}" for i in range(3)]))
+    
+    explanations = await asyncio.gather(
+        *[explainer.explain("CKD_NSAID", sample_patient) for _ in range(3)]
+    )
+    assert [e["explanation"] for e in explanations] == ["Explanation 0", "Explanation 1", "Explanation 2"]
+    assert mock_openai.call_count == 1
+
+@pytest.mark.asyncio
+async def test_malformed_batch_element_falls_back_alone(monkeypatch, sample_patient):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    explainer = LLMExplainer()
+    budgets = []
+    async def complete(prompt, max_tokens):
+        budgets.append(max_tokens)
+        # Second element isn't a string, and the reply was cut off before the last case
+        return '["Explanation 0", {"text": "wrong shape"}, "Explanation 2", "Expl'
+    monkeypatch.setattr(explainer, "_complete", complete)
+    
+    explanations = await asyncio.gather(
+        *[explainer.explain("CKD_NSAID", sample_patient) for _ in range(4)]
+    )
+    template = explainer._generate_template_explanation("CKD_NSAID", sample_patient)
+    assert explanations[0]["explanation"] == "Explanation 0"
+    assert explanations[1] == template
+    assert explanations[2]["explanation"] == "Explanation 2"
+    assert explanations[3] == template
+    assert budgets == [4 * EXPLANATION_MAX_TOKENS]
+
+@pytest.mark.asyncio
+async def test_batch_token_budget_is_capped(monkeypatch, sample_patient):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    explainer = LLMExplainer(max_batch_size=16)
+    budgets = []
+    async def complete(prompt, max_tokens):
+        budgets.append(max_tokens)
+        return json.dumps([f"Explanation {i}" for i in range(16)])
+    monkeypatch.setattr(explainer, "_complete", complete)
+    
+    await asyncio.gather(*[explainer.explain("CKD_NSAID", sample_patient) for _ in range(16)])
+    assert budgets == [MAX_COMPLETION_TOKENS]
+
+RATE_LIMITED = {"status": 429, "payload": {"error": {"message": "Rate limit exceeded"}}}
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried_before_fallback(keyed_explainer, mock_openai, sample_patient):
+    mock_openai.reset()
+    mock_openai.add_response(**RATE_LIMITED)
+    mock_openai.add_response(content="Recovered after a transient 429")
+    
+    explanation = await keyed_explainer.explain("CKD_NSAID", sample_patient)
+    assert explanation["explanation"] == "Recovered after a transient 429"
+    assert mock_openai.call_count == 2
+
+@pytest.mark.asyncio
+async def test_timeout_is_retried_before_fallback(keyed_explainer, mock_openai, sample_patient):
+    mock_openai.reset()
+    mock_openai.add_response(exception=asyncio.TimeoutError("API Timeout"))
+    mock_openai.add_response(content="Recovered after a timeout")
+    
+    explanation = await keyed_explainer.explain("CKD_NSAID", sample_patient)
+    assert explanation["explanation"] == "Recovered after a timeout"
+    assert mock_openai.call_count == 2
+
+@pytest.mark.asyncio
+async def test_template_fallback_after_retries_exhausted(keyed_explainer, mock_openai, sample_patient):
+    mock_openai.set_response(**RATE_LIMITED)
+    
+    explanation = await keyed_explainer.explain("CKD_NSAID", sample_patient)
+    assert explanation == keyed_explainer._generate_template_explanation("CKD_NSAID", sample_patient)
+    assert mock_openai.call_count == keyed_explainer.max_attempts
+
+@pytest.mark.asyncio
+async def test_non_transient_error_is_not_retried(keyed_explainer, mock_openai, sample_patient):
+    mock_openai.set_response(status=400, payload={"error": {"message": "Bad request"}})
+    
+    await keyed_explainer.explain("CKD_NSAID", sample_patient)
+    assert mock_openai.call_count == 1
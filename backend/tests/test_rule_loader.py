@@ -1,8 +1,7 @@
 import pytest
 import os
 import yaml
-from rule_loader import RuleLoader
-from models import Rule, SeverityLevel
+from rule_loader import RuleLoader, Rule, SeverityLevel, SafeLoader, SafeDumper, _validate_frozen
 
 @pytest.fixture
 def temp_rules_dir(tmp_path):
@@ -58,7 +57,7 @@ def sample_rule_file(temp_rules_dir):
     
     rule_file = temp_rules_dir / "CKD_NSAID.yaml"
     with open(rule_file, "w") as f:
-        yaml.dump(rule_data, f)
+        yaml.dump(rule_data, f, Dumper=SafeDumper)
     
     return rule_file
 
@@ -71,7 +70,7 @@ def invalid_rule_file(temp_rules_dir):
     
     rule_file = temp_rules_dir / "Invalid_Rule.yaml"
     with open(rule_file, "w") as f:
-        yaml.dump(invalid_data, f)
+        yaml.dump(invalid_data, f, Dumper=SafeDumper)
     
     return rule_file
 
@@ -81,11 +80,10 @@ def rule_loader(temp_rules_dir):
 
 def test_rule_loader_initialization(rule_loader, temp_rules_dir):
     assert rule_loader.rules_dir == str(temp_rules_dir)
-    assert isinstance(rule_loader.rules, dict)
-    assert len(rule_loader.rules) == 0
+    assert rule_loader.load_rules() == []
 
 def test_load_rules(rule_loader, sample_rule_file):
-    rules = rule_loader.load_rules()
+    rules = {rule.id: rule for rule in rule_loader.load_rules()}
     assert len(rules) == 1
     assert "CKD_NSAID" in rules
     assert isinstance(rules["CKD_NSAID"], Rule)
@@ -100,10 +98,10 @@ def test_load_invalid_rule(rule_loader, invalid_rule_file):
 
 def test_validate_rule(rule_loader, sample_rule_file):
     with open(sample_rule_file) as f:
-        rule_data = yaml.safe_load(f)
+        rule_data = yaml.load(f, Loader=SafeLoader)
     
-    validated_rule = rule_loader.validate_rule(rule_data)
-    assert isinstance(validated_rule, Rule)
+    assert rule_loader.validate_rule(rule_data) is True
+    validated_rule = Rule(**rule_data)
     assert validated_rule.id == "CKD_NSAID"
     assert validated_rule.text == "Avoid NSAIDs in advanced CKD"
     assert validated_rule.severity == SeverityLevel.ERROR
@@ -115,9 +113,7 @@ def test_validate_invalid_rule(rule_loader):
         "text": "Invalid rule without required fields"
     }
     
-    with pytest.raises(Exception) as exc_info:
-        rule_loader.validate_rule(invalid_rule)
-    assert "Validation error" in str(exc_info.value)
+    assert rule_loader.validate_rule(invalid_rule) is False
 
 def test_save_rule(rule_loader, temp_rules_dir):
     rule_data = {
@@ -136,8 +132,7 @@ def test_save_rule(rule_loader, temp_rules_dir):
         ]
     }
     
-    rule = rule_loader.validate_rule(rule_data)
-    rule_loader.save_rule(rule)
+    assert rule_loader.save_rule(rule_data) is True
     
     # Check if file was created
     rule_file = temp_rules_dir / "New_Rule.yaml"
@@ -145,7 +140,7 @@ def test_save_rule(rule_loader, temp_rules_dir):
     
     # Check if rule can be loaded back
     with open(rule_file) as f:
-        loaded_data = yaml.safe_load(f)
+        loaded_data = yaml.load(f, Loader=SafeLoader)
     assert loaded_data["id"] == "New_Rule"
     assert loaded_data["text"] == "New test rule"
 
@@ -168,7 +163,7 @@ def test_load_rules_with_empty_directory(rule_loader, temp_rules_dir):
     rules = rule_loader.load_rules()
     assert len(rules) == 0
 
-def test_validate_rule_with_invalid_severity(rule_loader):
+def test_validate_rule_with_invalid_severity(rule_loader, caplog):
     invalid_rule = {
         "id": "Invalid_Severity",
         "text": "Rule with invalid severity",
@@ -185,11 +180,11 @@ def test_validate_rule_with_invalid_severity(rule_loader):
         ]
     }
     
-    with pytest.raises(Exception) as exc_info:
-        rule_loader.validate_rule(invalid_rule)
-    assert "Invalid severity level" in str(exc_info.value)
+    assert rule_loader.validate_rule(invalid_rule) is False
+    assert "Error validating rule" in caplog.text
+    assert "severity" in caplog.text
 
-def test_validate_rule_with_invalid_confidence(rule_loader):
+def test_validate_rule_with_invalid_confidence(rule_loader, caplog):
     invalid_rule = {
         "id": "Invalid_Confidence",
         "text": "Rule with invalid confidence",
@@ -206,6 +201,47 @@ def test_validate_rule_with_invalid_confidence(rule_loader):
         ]
     }
     
-    with pytest.raises(Exception) as exc_info:
-        rule_loader.validate_rule(invalid_rule)
-    assert "Confidence must be between 0 and 1" in str(exc_info.value) 
\ No newline at end of file
+    assert rule_loader.validate_rule(invalid_rule) is False
+    assert "Error validating rule" in caplog.text
+    assert "confidence" in caplog.text
+
+def test_load_rules_reuses_unchanged_files(rule_loader, sample_rule_file):
+    first = rule_loader.load_rules()
+    second = rule_loader.load_rules()
+    assert [r.id for r in second] == [r.id for r in first]
+    assert all(a is b for a, b in zip(first, second))
+    
+    # Rewriting the file changes its size/mtime and forces a re-parse
+    with open(sample_rule_file) as f:
+        rule_data = yaml.load(f, Loader=SafeLoader)
+    rule_data["text"] = "Avoid NSAIDs in advanced chronic kidney disease"
+    with open(sample_rule_file, "w") as f:
+        yaml.dump(rule_data, f, Dumper=SafeDumper)
+    
+    reloaded = rule_loader.load_rules()
+    assert reloaded[0].text == "Avoid NSAIDs in advanced chronic kidney disease"
+
+def test_validate_rule_memoizes_equal_dicts(rule_loader, sample_rule_file):
+    with open(sample_rule_file) as f:
+        rule_data = yaml.load(f, Loader=SafeLoader)
+    _validate_frozen.cache_clear()
+    
+    rule_loader.validate_rule(rule_data)
+    # Same content with a different key order hits the cache
+    rule_loader.validate_rule(dict(reversed(list(rule_data.items()))))
+    info = _validate_frozen.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+def test_rule_schema_matches_pydantic_model(sample_rule_file):
+    fastjsonschema = pytest.importorskip("fastjsonschema")
+    import rule_loader as rule_loader_module
+    validate = rule_loader_module._compile_rule_schema()
+    with open(sample_rule_file) as f:
+        rule_data = yaml.load(f, Loader=SafeLoader)
+    
+    rule = rule_loader_module.FastRule(**validate(rule_data))
+    assert rule.id == "CKD_NSAID"
+    assert rule.severity == SeverityLevel.ERROR
+    
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({**rule_data, "confidence": 1.5})
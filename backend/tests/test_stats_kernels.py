@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+import _stats_kernels
+from _stats_kernels import histogram, llm_reduce, _histogram_numpy, _llm_reduce_numpy
+
+@pytest.fixture
+def codes():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 7, size=10_000).astype(np.int32)
+
+def test_histogram_matches_bincount(codes):
+    assert np.array_equal(histogram(codes, 9), _histogram_numpy(codes, 9))
+
+def test_llm_reduce_matches_bincount(codes):
+    latencies = np.random.default_rng(1).random(codes.size)
+    counts, totals = llm_reduce(codes, latencies, 9)
+    expected_counts, expected_totals = _llm_reduce_numpy(codes, latencies, 9)
+    assert np.array_equal(counts, expected_counts)
+    assert np.allclose(totals, expected_totals)
+
+def test_kernels_handle_empty_input():
+    codes = np.empty(0, dtype=np.int32)
+    assert np.array_equal(histogram(codes, 3), np.zeros(3))
+    counts, totals = llm_reduce(codes, np.empty(0), 3)
+    assert np.array_equal(counts, np.zeros(3))
+    assert np.array_equal(totals, np.zeros(3))
+
+@pytest.mark.skipif(_stats_kernels.njit is None, reason="numba not installed")
+def test_numba_kernels_are_active():
+    assert histogram is _stats_kernels._histogram_numba
+    assert llm_reduce is _stats_kernels._llm_reduce_numba
@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks guarding TrieEngine search against performance regressions.
+
+pytest-benchmark switches itself off under xdist, so run these serially, as
+their own job; with benchmarking disabled the budget checks skip:
+
+    pytest tests/test_trie_benchmark.py -p no:xdist --benchmark-autosave
+    pytest tests/test_trie_benchmark.py -p no:xdist --benchmark-compare --benchmark-compare-fail=mean:20%
+
+The second command fails when the mean of any benchmark regresses by more
+than 20 % against the last saved run.
+"""
+import pytest
+from trie_engine import TrieEngine
+
+pytest.importorskip("pytest_benchmark")
+
+RULE_COUNT = 2000
+DRUGS = ["ibuprofen", "amiodarone", "warfarin", "metformin", "lisinopril"]
+ACTIONS = ["Avoid", "Monitor", "Reduce", "Review"]
+
+@pytest.fixture(scope="module")
+def big_rules():
+    return [
+        {
+            "id": f"RULE_{i}",
+            "text": f"{ACTIONS[i % len(ACTIONS)]} {DRUGS[i % len(DRUGS)]} dose {i}",
+            "conditions": [
+                {"type": "lab"},
+                {"type": f"medication_{DRUGS[i % len(DRUGS)]}"}
+            ]
+        }
+        for i in range(RULE_COUNT)
+    ]
+
+@pytest.fixture
+def loaded_trie(big_rules):
+    trie = TrieEngine()
+    for rule in big_rules:
+        trie.add_rule(rule)
+    return trie
+
+def _assert_mean_below(benchmark, budget):
+    # stats stay None when benchmarking is disabled (e.g. under xdist or --benchmark-disable)
+    if benchmark.stats is None:
+        pytest.skip("benchmarks disabled")
+    assert benchmark.stats.stats.mean < budget
+
+@pytest.mark.benchmark(group="trie")
+def test_search_scales(benchmark, loaded_trie):
+    results = benchmark(loaded_trie.search, "avoid")
+    assert len(results) == RULE_COUNT // len(ACTIONS)
+    _assert_mean_below(benchmark, 1e-4)
+
+@pytest.mark.benchmark(group="trie")
+def test_uncached_search(benchmark, loaded_trie):
+    results = benchmark.pedantic(
+        loaded_trie.search, args=("avoid",), setup=loaded_trie._search_cache.clear, rounds=200
+    )
+    assert len(results) == RULE_COUNT // len(ACTIONS)
+    _assert_mean_below(benchmark, 5e-3)
+
+@pytest.mark.benchmark(group="trie")
+def test_frozen_uncached_search(benchmark, loaded_trie):
+    loaded_trie.freeze()
+    results = benchmark.pedantic(
+        loaded_trie.search, args=("avoid",), setup=loaded_trie._search_cache.clear, rounds=200
+    )
+    assert len(results) == RULE_COUNT // len(ACTIONS)
+    _assert_mean_below(benchmark, 1e-3)
+
+@pytest.mark.benchmark(group="trie")
+def test_add_rules(benchmark, big_rules):
+    def build():
+        trie = TrieEngine()
+        for rule in big_rules:
+            trie.add_rule(rule)
+        return trie
+    
+    trie = benchmark.pedantic(build, rounds=10)
+    assert len(trie.get_all_rules()) == RULE_COUNT
+    _assert_mean_below(benchmark, 0.5)
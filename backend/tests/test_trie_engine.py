@@ -58,7 +58,7 @@ def test_trie_node_creation():
     node = TrieNode()
     assert node.children == {}
     assert node.is_end_of_word is False
-    assert node.rule_ids == set()
+    assert node.rule_mask == 0
 
 def test_insert_word(trie_engine):
     trie_engine.insert("test")
@@ -71,23 +71,24 @@ def test_insert_word(trie_engine):
 def test_insert_word_with_rule_id(trie_engine):
     trie_engine.insert("test", "rule1")
     assert "t" in trie_engine.root.children
-    assert "rule1" in trie_engine.root.children["t"].children["e"].children["s"].children["t"].rule_ids
+    assert trie_engine.root.children["t"].children["e"].children["s"].children["t"].rule_mask != 0
+    assert "rule1" in trie_engine.get_rule_ids("test")
 
 def test_search_prefix(trie_engine):
     trie_engine.insert("test")
     trie_engine.insert("testing")
     trie_engine.insert("tested")
     
+    assert trie_engine.count_prefix("test") == 3
     results = trie_engine.search("test")
-    assert len(results) == 3
     assert "test" in results
     assert "testing" in results
     assert "tested" in results
 
 def test_search_nonexistent_prefix(trie_engine):
     trie_engine.insert("test")
-    results = trie_engine.search("nonexistent")
-    assert len(results) == 0
+    assert trie_engine.has_prefix("nonexistent") is False
+    assert trie_engine.count_prefix("nonexistent") == 0
 
 def test_get_rule_ids(trie_engine):
     trie_engine.insert("test", "rule1")
@@ -129,8 +130,12 @@ def test_get_all_rules(trie_engine, sample_rules):
     
     all_rules = trie_engine.get_all_rules()
     assert len(all_rules) == 2
-    assert "CKD_NSAID" in all_rules
-    assert "QT_Prolongation" in all_rules
+    assert {rule["id"] for rule in all_rules} == {"CKD_NSAID", "QT_Prolongation"}
+    
+    # The snapshot is reused until the rules change
+    assert trie_engine.get_all_rules() is all_rules
+    trie_engine.remove_rule("CKD_NSAID")
+    assert [rule["id"] for rule in trie_engine.get_all_rules()] == ["QT_Prolongation"]
 
 def test_case_insensitive_search(trie_engine):
     trie_engine.insert("Test")
@@ -141,8 +146,8 @@ def test_case_insensitive_search(trie_engine):
 def test_empty_prefix_search(trie_engine):
     trie_engine.insert("test")
     trie_engine.insert("testing")
+    assert trie_engine.count_prefix("") == 2
     results = trie_engine.search("")
-    assert len(results) == 2
     assert "test" in results
     assert "testing" in results
 
@@ -160,4 +165,62 @@ def test_remove_nonexistent_rule(trie_engine):
     
     rule_ids = trie_engine.get_rule_ids("test")
     assert len(rule_ids) == 1
-    assert "rule1" in rule_ids 
\ No newline at end of file
+    assert "rule1" in rule_ids 
+
+def test_search_cache_invalidated_on_insert(trie_engine):
+    trie_engine.insert("test")
+    assert trie_engine.search("te") == ["test"]
+    
+    trie_engine.insert("team")
+    results = trie_engine.search("te")
+    assert len(results) == 2
+    assert "team" in results
+
+def test_frozen_search_matches_trie(trie_engine, sample_rules):
+    for rule in sample_rules:
+        trie_engine.add_rule(rule)
+    expected = sorted(trie_engine.search("m"))
+    
+    trie_engine.freeze()
+    assert sorted(trie_engine.search("m")) == expected
+    assert trie_engine.search("nonexistent") == []
+    
+    # Mutations fall back to the node walk until the next freeze
+    trie_engine.insert("Metformin")
+    assert "Metformin" in trie_engine.search("met")
+
+def test_remove_rule_keeps_shared_keywords(trie_engine, sample_rules):
+    for rule in sample_rules:
+        trie_engine.add_rule(rule)
+    trie_engine.remove_rule("CKD_NSAID")
+    
+    # Condition types shared with the remaining rule stay indexed
+    assert trie_engine.get_rule_ids("lab") == {"QT_Prolongation"}
+    assert trie_engine.search("Avoid") == []
+
+def test_trie_node_has_no_instance_dict():
+    node = TrieNode()
+    assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        node.unexpected = True
+
+def test_get_prefix_rule_ids(trie_engine, sample_rules):
+    for rule in sample_rules:
+        trie_engine.add_rule(rule)
+    
+    assert trie_engine.get_prefix_rule_ids("m") == {"CKD_NSAID", "QT_Prolongation"}
+    assert trie_engine.get_prefix_rule_ids("avoid") == {"CKD_NSAID"}
+    
+    trie_engine.remove_rule("CKD_NSAID")
+    assert trie_engine.get_prefix_rule_ids("m") == {"QT_Prolongation"}
+    assert trie_engine.get_prefix_rule_ids("nonexistent") == set()
+
+def test_count_prefix_tracks_removals(trie_engine, sample_rules):
+    for rule in sample_rules:
+        trie_engine.add_rule(rule)
+    assert trie_engine.count_prefix("m") == len(trie_engine.search("m"))
+    assert trie_engine.has_prefix("avoid")
+    
+    trie_engine.remove_rule("CKD_NSAID")
+    assert trie_engine.count_prefix("m") == len(trie_engine.search("m"))
+    assert not trie_engine.has_prefix("avoid")
@@ -0,0 +1,210 @@
+import os
+import time
+import asyncio
+from collections import Counter
+import pytest
+import pytest_asyncio
+import usage_dashboard
+from usage_dashboard import UsageDashboard, MMAP_MIN_SIZE, _FRAME_HEADER
+
+class Clock:
+    """Stands in for the time module inside usage_dashboard"""
+    
+    monotonic = staticmethod(time.monotonic)
+    
+    def __init__(self, now):
+        self.now = now
+    
+    def time(self):
+        return self.now
+
+@pytest_asyncio.fixture
+async def dashboard(tmp_path, monkeypatch):
+    # The key file and metric logs are created under the working directory
+    monkeypatch.chdir(tmp_path)
+    dashboard = UsageDashboard()
+    yield dashboard
+    await dashboard.close()
+
+async def _record(dashboard, metric_type, datas):
+    for data in datas:
+        await dashboard.record_metric(metric_type, data)
+    await dashboard.flush()
+
+def _values(metrics, key):
+    return [metric["data"][key] for metric in metrics]
+
+@pytest.mark.asyncio
+async def test_record_flush_get_metrics_round_trip(dashboard):
+    alerts = [{"severity": "high", "response_time": i} for i in range(5)]
+    await _record(dashboard, "alert", alerts)
+    
+    metrics = await dashboard.get_metrics("alert")
+    assert [metric["data"] for metric in metrics] == alerts
+    assert all(metric["type"] == "alert" for metric in metrics)
+    
+    # Frames are encrypted at rest
+    with open(dashboard._log_path("alert"), "rb") as f:
+        assert b"severity" not in f.read()
+    
+    # A new record invalidates the cached window, even before it is flushed
+    await dashboard.record_metric("alert", {"severity": "low", "response_time": 5})
+    assert _values(await dashboard.get_metrics("alert"), "response_time") == list(range(6))
+
+@pytest.mark.asyncio
+async def test_read_bisects_sparse_index(dashboard, monkeypatch):
+    clock = Clock(time.time() - 2 * 86400)
+    monkeypatch.setattr(usage_dashboard, "time", clock)
+    pad = "x" * 1024
+    await _record(dashboard, "alert", [{"response_time": i, "pad": pad} for i in range(300)])
+    clock.now += 2 * 86400
+    await _record(dashboard, "alert", [{"response_time": -1}])
+    
+    timestamps, offsets = dashboard._load_index("alert")
+    assert len(offsets) > 2
+    
+    starts = []
+    bisect_right = usage_dashboard.bisect_right
+    monkeypatch.setattr(
+        usage_dashboard, "bisect_right", lambda a, x: starts.append(bisect_right(a, x)) or starts[-1]
+    )
+    metrics = await dashboard.get_metrics("alert", "24h")
+    assert _values(metrics, "response_time") == [-1]
+    # The scan started at the last index entry before the window, not at the head of the log
+    assert offsets[starts[-1] - 1] > 0
+
+@pytest.mark.asyncio
+async def test_mmap_and_buffered_reads_agree(dashboard, monkeypatch):
+    pad = "x" * 2048
+    await _record(dashboard, "llm", [{"model": "gpt-4", "latency": i, "pad": pad} for i in range(600)])
+    assert os.path.getsize(dashboard._log_path("llm")) >= MMAP_MIN_SIZE
+    
+    mapped = []
+    map_log = UsageDashboard._map_log
+    monkeypatch.setattr(
+        UsageDashboard, "_map_log", staticmethod(lambda log_path: mapped.append(log_path) or map_log(log_path))
+    )
+    via_mmap = await dashboard._read_metrics("llm", "24h")
+    monkeypatch.setattr(usage_dashboard, "MMAP_MIN_SIZE", float("inf"))
+    via_read = await dashboard._read_metrics("llm", "24h")
+    
+    assert len(mapped) == 1
+    assert via_mmap == via_read
+    assert _values(via_read, "latency") == list(range(600))
+
+@pytest.mark.asyncio
+async def test_bucket_summary_matches_raw_stats(dashboard, monkeypatch):
+    await _record(dashboard, "alert", [
+        {"severity": "high", "response_time": 1.5},
+        {"severity": "low", "response_time": 2.0},
+        {"severity": "high", "response_time": 4.0},
+        {"response_time": 3.0}
+    ])
+    await _record(dashboard, "llm", [
+        {"model": "gpt-4", "latency": 0.5},
+        {"model": "gpt-3.5", "latency": 0.25},
+        {"model": "gpt-4", "latency": 1.0}
+    ])
+    await _record(dashboard, "rule", [{"rule_id": "CKD_NSAID"}, {"rule_id": "QT_Prolongation"}, {"rule_id": "CKD_NSAID"}])
+    await _record(dashboard, "feedback", [{"type": "helpful"}, {"type": "not_helpful"}])
+    
+    from_buckets = await dashboard.get_dashboard_data("24h")
+    
+    async def no_buckets(*args):
+        raise AssertionError("windows past BUCKET_RETENTION aggregate the raw log")
+    monkeypatch.setattr(dashboard, "_window_summary", no_buckets)
+    from_raw = await dashboard.get_dashboard_data("30d")
+    
+    from_buckets.pop("generated_at")
+    from_raw.pop("generated_at")
+    assert from_buckets == from_raw
+    assert from_raw["alerts"] == {
+        "total_alerts": 4,
+        "severity_distribution": {"high": 2, "low": 1, "unknown": 1},
+        "avg_response_time": 2.625
+    }
+    assert from_raw["llm"]["model_stats"] == {
+        "gpt-4": {"count": 2, "avg_latency": 0.75},
+        "gpt-3.5": {"count": 1, "avg_latency": 0.25}
+    }
+    assert from_raw["rules"]["rule_distribution"] == {"CKD_NSAID": 2, "QT_Prolongation": 1}
+    assert from_raw["feedback"]["total_feedback"] == 2
+
+@pytest.mark.asyncio
+async def test_bucket_rebuild_does_not_block_writers(dashboard, monkeypatch):
+    await _record(dashboard, "alert", [{"severity": "high", "response_time": 1.0}] * 3)
+    restarted = UsageDashboard()
+    
+    # Hold the rebuild's log scan until the writes below are through
+    scanning, resume = asyncio.Event(), asyncio.Event()
+    read_metrics = restarted._read_metrics
+    async def slow_read(*args):
+        scanning.set()
+        await resume.wait()
+        return await read_metrics(*args)
+    monkeypatch.setattr(restarted, "_read_metrics", slow_read)
+    
+    try:
+        await restarted.record_metric("alert", {"severity": "low", "response_time": 2.0})
+        await asyncio.wait_for(scanning.wait(), 1)
+        await asyncio.wait_for(_record(restarted, "alert", [{"severity": "low", "response_time": 3.0}]), 1)
+        resume.set()
+        
+        # Records from before the scan's snapshot are read from the log, later ones replayed once
+        summary = await restarted._window_summary("alert", "24h")
+        assert summary["count"] == 5
+        assert summary["sum"] == 8.0
+        assert summary["labels"] == Counter({"high": 3, "low": 2})
+    finally:
+        await restarted.close()
+
+@pytest.mark.asyncio
+async def test_torn_tail_does_not_hide_later_records(dashboard):
+    await _record(dashboard, "alert", [{"response_time": i} for i in range(10)])
+    log_path = dashboard._log_path("alert")
+    
+    # A crash mid-append leaves a partial frame behind
+    with open(log_path, "ab") as f:
+        f.write(b"\x00" * 7)
+    await _record(dashboard, "alert", [{"response_time": 10}])
+    assert _values(await dashboard.get_metrics("alert"), "response_time") == list(range(11))
+    
+    # A complete but corrupt frame is skipped on its own
+    with open(log_path, "ab") as f:
+        f.write(_FRAME_HEADER.pack(time.time(), 32) + os.urandom(32))
+    await _record(dashboard, "alert", [{"response_time": 11}])
+    assert _values(await dashboard.get_metrics("alert"), "response_time") == list(range(12))
+    
+    # A restarted dashboard reads the same records
+    restarted = UsageDashboard()
+    try:
+        assert _values(await restarted._read_metrics("alert", "24h"), "response_time") == list(range(12))
+    finally:
+        await restarted.close()
+
+@pytest.mark.asyncio
+async def test_failed_write_leaves_no_partial_frame(dashboard, monkeypatch):
+    await _record(dashboard, "alert", [{"response_time": i} for i in range(3)])
+    size = os.path.getsize(dashboard._log_path("alert"))
+    
+    def disk_full(fd):
+        raise OSError("No space left on device")
+    with monkeypatch.context() as patched:
+        patched.setattr(usage_dashboard, "_fdatasync", disk_full)
+        await dashboard.record_metric("alert", {"response_time": 3})
+        with pytest.raises(OSError):
+            await dashboard.flush()
+    assert os.path.getsize(dashboard._log_path("alert")) == size
+    
+    await _record(dashboard, "alert", [{"response_time": 4}])
+    assert _values(await dashboard.get_metrics("alert"), "response_time") == [0, 1, 2, 4]
+
+@pytest.mark.asyncio
+async def test_close_releases_decrypt_workers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dashboard = UsageDashboard()
+    await _record(dashboard, "alert", [{"response_time": 1}])
+    await dashboard._read_metrics("alert", "24h")
+    await dashboard.close()
+    with pytest.raises(RuntimeError):
+        dashboard._pool.submit(int)
@@ -1,20 +1,50 @@
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=8192)
+def _norm(text: str) -> str:
+    """Lowercase text for trie keys, skipping the copy if already lowercase ASCII"""
+    return text if (text.isascii() and text.islower()) else text.lower()
+
 class TrieNode:
+    # No per-node __dict__; the trie can hold a node per character of every rule text
+    __slots__ = ('children', 'is_end_of_word', 'rule_mask', 'texts', 'word_count')
+
     def __init__(self):
         self.children: Dict[str, 'TrieNode'] = {}
         self.is_end_of_word: bool = False
-        self.rule_ids: Set[str] = set()
+        # Bit i set <=> the rule interned at index i ends here
+        self.rule_mask: int = 0
+        self.texts: Set[str] = set()
+        # Number of texts stored at or below this node
+        self.word_count: int = 0
 
 class TrieEngine:
-    def __init__(self):
+    def __init__(self, search_cache_size: int = 1024):
         self.root = TrieNode()
         self.rules: Dict[str, Dict[str, Any]] = {}
+        self._rules_snapshot: Optional[Tuple[Dict[str, Any], ...]] = None
+        # LRU cache of lowercased prefix -> matching texts
+        self.search_cache_size = search_cache_size
+        self._search_cache: 'OrderedDict[str, List[str]]' = OrderedDict()
+        # Lowercased text -> terminal node, for exact-match lookups
+        self._terminals: Dict[str, TrieNode] = {}
+        # Interned rule IDs: bit positions used in TrieNode.rule_mask
+        self._rule_id_to_idx: Dict[str, int] = {}
+        self._idx_to_rule_id: List[str] = []
+        # Rule ID -> {lowercased text: terminal node} for direct removal
+        self._rule_terminals: Dict[str, Dict[str, TrieNode]] = {}
+        # Frozen form: parallel sorted arrays of keys and their texts
+        self._frozen = False
+        self._frozen_keys: List[str] = []
+        self._frozen_texts: List[tuple] = []
 
     def insert(self, text: str, rule_id: str = None) -> None:
         """
@@ -24,14 +54,24 @@ class TrieEngine:
             text: The text to insert
             rule_id: Optional rule ID associated with this text
         """
-        node = self.root
-        for char in text.lower():
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
+        key = _norm(text)
+        node = self._terminals.get(key)
+        if node is None:
+            node = self.root
+            for char in key:
+                if char not in node.children:
+                    node.children[char] = TrieNode()
+                node = node.children[char]
+            self._terminals[key] = node
         node.is_end_of_word = True
+        if text not in node.texts:
+            node.texts.add(text)
+            self._adjust_word_counts(key, 1)
         if rule_id:
-            node.rule_ids.add(rule_id)
+            node.rule_mask |= 1 << self._intern_rule_id(rule_id)
+            self._rule_terminals.setdefault(rule_id, {})[key] = node
+        self._frozen = False
+        self._search_cache.clear()
 
     def search(self, prefix: str) -> List[str]:
         """
@@ -43,31 +83,116 @@ class TrieEngine:
         Returns:
             List of matching texts
         """
+        key = _norm(prefix)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            self._search_cache.move_to_end(key)
+            return list(cached)
+        
+        if self._frozen:
+            words = self._search_frozen(key)
+        else:
+            node = self.root
+            for char in key:
+                if char not in node.children:
+                    return []
+                node = node.children[char]
+            words = self._get_all_words(node)
+        
+        self._search_cache[key] = words
+        if len(self._search_cache) > self.search_cache_size:
+            self._search_cache.popitem(last=False)
+        return list(words)
+
+    def has_prefix(self, prefix: str) -> bool:
+        """
+        Check whether any text starts with the given prefix.
+        
+        Args:
+            prefix: The prefix to look for
+            
+        Returns:
+            True if at least one text matches
+        """
+        return self.count_prefix(prefix) > 0
+
+    def count_prefix(self, prefix: str) -> int:
+        """
+        Count the texts that start with the given prefix without collecting them.
+        
+        Args:
+            prefix: The prefix to count
+            
+        Returns:
+            Number of matching texts
+        """
         node = self.root
-        for char in prefix.lower():
-            if char not in node.children:
-                return []
+        for char in _norm(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return 0
+        return node.word_count
+
+    def _adjust_word_counts(self, key: str, delta: int) -> None:
+        """
+        Add delta to the word count of every node on the path to a key.
+        
+        Args:
+            key: The lowercased text whose path to update
+            delta: The change in the number of texts
+        """
+        node = self.root
+        node.word_count += delta
+        for char in key:
             node = node.children[char]
+            node.word_count += delta
+
+    def freeze(self) -> None:
+        """
+        Compile the trie into flat sorted arrays for prefix search.
         
-        return self._get_all_words(node, prefix)
+        Searches then bisect over contiguous lists instead of chasing node
+        pointers. Any insert or removal thaws the engine back to the node
+        walk until freeze() is called again.
+        """
+        keys = sorted(self._terminals)
+        self._frozen_keys = keys
+        self._frozen_texts = [tuple(self._terminals[key].texts) for key in keys]
+        self._frozen = True
+        self._search_cache.clear()
 
-    def _get_all_words(self, node: TrieNode, prefix: str) -> List[str]:
+    def _search_frozen(self, key: str) -> List[str]:
         """
-        Get all words starting from a given node.
+        Prefix search over the frozen arrays.
         
         Args:
-            node: The current trie node
-            prefix: The prefix accumulated so far
+            key: The lowercased prefix
             
         Returns:
-            List of complete words
+            List of matching texts
         """
-        words = []
-        if node.is_end_of_word:
-            words.append(prefix)
+        keys = self._frozen_keys
+        start = bisect_left(keys, key)
+        end = bisect_left(keys, key + '\U0010ffff', start)
+        return [text for texts in self._frozen_texts[start:end] for text in texts]
+
+    def _get_all_words(self, node: TrieNode) -> List[str]:
+        """
+        Get all words stored at or below a given node.
         
-        for char, child in node.children.items():
-            words.extend(self._get_all_words(child, prefix + char))
+        Args:
+            node: The node to start from
+            
+        Returns:
+            List of complete words, in their originally inserted case
+        """
+        words = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.is_end_of_word:
+                words.extend(current.texts)
+            stack.extend(current.children.values())
         
         return words
 
@@ -78,16 +203,73 @@ class TrieEngine:
         Args:
             text: The text to look up
             
+        Returns:
+            Set of rule IDs
+        """
+        node = self._terminals.get(_norm(text))
+        if node is None:
+            return set()
+        
+        return self._decode_mask(node.rule_mask)
+
+    def get_prefix_rule_ids(self, prefix: str) -> Set[str]:
+        """
+        Get the IDs of all rules with a text starting with the given prefix.
+        
+        Args:
+            prefix: The prefix to search for
+            
         Returns:
             Set of rule IDs
         """
         node = self.root
-        for char in text.lower():
+        for char in _norm(prefix):
             if char not in node.children:
                 return set()
             node = node.children[char]
         
-        return node.rule_ids if node.is_end_of_word else set()
+        mask = 0
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            mask |= current.rule_mask
+            stack.extend(current.children.values())
+        return self._decode_mask(mask)
+
+    def _intern_rule_id(self, rule_id: str) -> int:
+        """
+        Get the bit index for a rule ID, assigning the next free one if new.
+        
+        Args:
+            rule_id: The rule ID to intern
+            
+        Returns:
+            Bit index of the rule ID
+        """
+        idx = self._rule_id_to_idx.get(rule_id)
+        if idx is None:
+            idx = len(self._idx_to_rule_id)
+            self._rule_id_to_idx[rule_id] = idx
+            self._idx_to_rule_id.append(rule_id)
+        return idx
+
+    def _decode_mask(self, mask: int) -> Set[str]:
+        """
+        Decode a rule bitmap into rule IDs.
+        
+        Args:
+            mask: Bitmap of interned rule indices
+            
+        Returns:
+            Set of rule IDs
+        """
+        rule_ids = set()
+        idx_to_rule_id = self._idx_to_rule_id
+        while mask:
+            low = mask & -mask
+            rule_ids.add(idx_to_rule_id[low.bit_length() - 1])
+            mask ^= low
+        return rule_ids
 
     def add_rule(self, rule: Dict[str, Any]) -> None:
         """
@@ -102,6 +284,7 @@ class TrieEngine:
 
         rule_id = rule['id']
         self.rules[rule_id] = rule
+        self._rules_snapshot = None
         
         # Insert the rule text
         self.insert(rule['text'], rule_id)
@@ -119,17 +302,13 @@ class TrieEngine:
             rule_id: The ID of the rule to remove
         """
         if rule_id in self.rules:
-            rule = self.rules[rule_id]
-            # Remove the rule text
-            self._remove_text(rule['text'], rule_id)
-            
-            # Remove keywords from conditions
-            for condition in rule.get('conditions', []):
-                if 'type' in condition:
-                    self._remove_text(condition['type'], rule_id)
+            # Drop the rule ID straight from each terminal it was inserted at
+            for key, node in self._rule_terminals.pop(rule_id, {}).items():
+                self._discard_rule_id(key, node, rule_id)
             
             # Remove from rules dictionary
             del self.rules[rule_id]
+            self._rules_snapshot = None
 
     def _remove_text(self, text: str, rule_id: str) -> None:
         """
@@ -139,16 +318,34 @@ class TrieEngine:
             text: The text to remove
             rule_id: The rule ID to remove
         """
-        node = self.root
-        for char in text.lower():
-            if char not in node.children:
-                return
-            node = node.children[char]
+        key = _norm(text)
+        node = self._terminals.get(key)
+        if node is None:
+            return
+        
+        self._rule_terminals.get(rule_id, {}).pop(key, None)
+        self._discard_rule_id(key, node, rule_id)
+
+    def _discard_rule_id(self, key: str, node: TrieNode, rule_id: str) -> None:
+        """
+        Detach a rule ID from a terminal node, unmarking it once unused.
         
-        if node.is_end_of_word:
-            node.rule_ids.discard(rule_id)
-            if not node.rule_ids:
-                node.is_end_of_word = False
+        Args:
+            key: The lowercased text of the terminal
+            node: The terminal node
+            rule_id: The rule ID to remove
+        """
+        idx = self._rule_id_to_idx.get(rule_id)
+        if idx is not None:
+            node.rule_mask &= ~(1 << idx)
+        if not node.rule_mask:
+            node.is_end_of_word = False
+            if node.texts:
+                self._adjust_word_counts(key, -len(node.texts))
+                node.texts.clear()
+            self._terminals.pop(key, None)
+        self._frozen = False
+        self._search_cache.clear()
 
     def get_rule(self, rule_id: str) -> Dict[str, Any]:
         """
@@ -162,14 +359,28 @@ class TrieEngine:
         """
         return self.rules.get(rule_id)
 
-    def get_all_rules(self) -> List[Dict[str, Any]]:
+    def get_all_rules(self) -> Tuple[Dict[str, Any], ...]:
         """
         Get all rules in the engine.
         
+        The snapshot is shared between calls until the rules change, so
+        treat it as read-only; use get_all_rules_copy() to get a list.
+        
+        Returns:
+            Tuple of all rule dictionaries
+        """
+        if self._rules_snapshot is None:
+            self._rules_snapshot = tuple(self.rules.values())
+        return self._rules_snapshot
+
+    def get_all_rules_copy(self) -> List[Dict[str, Any]]:
+        """
+        Get a mutable list of all rules in the engine.
+        
         Returns:
             List of all rule dictionaries
         """
-        return list(self.rules.values())
+        return list(self.get_all_rules())
 
 # Example usage:
 # trie = TrieEngine()
@@ -179,4 +390,4 @@ class TrieEngine:
 #     "conditions": [{"type": "QT_interval"}]
 # })
 # matches = trie.search("mon")
-# print(matches)  # ['monitor qt interval'] 
\ No newline at end of file
+# print(matches)  # ['Monitor QT interval'] 
\ No newline at end of file
@@ -1,20 +1,99 @@
 import os
-import json
+import mmap
+import base64
+import time
+import struct
+import asyncio
 import logging
-from typing import Dict, Any, List
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional, Union
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter
 import aiofiles
-from cryptography.fernet import Fernet
-from .config import settings
+import msgpack
+import numpy as np
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from _stats_kernels import histogram, llm_reduce
 
 logger = logging.getLogger(__name__)
 
+# Log frame header: epoch timestamp, ciphertext length
+_FRAME_HEADER = struct.Struct("<dI")
+# Sparse index entry: epoch timestamp, byte offset of the frame in the log
+_INDEX_ENTRY = struct.Struct("<dQ")
+# Bytes of log between consecutive index entries
+INDEX_STRIDE = 64 * 1024
+# AES-GCM nonce prepended to every ciphertext
+NONCE_SIZE = 12
+# Seconds a get_metrics result stays fresh, per time range
+METRICS_CACHE_TTL = {"24h": 10.0, "7d": 60.0}
+DEFAULT_METRICS_CACHE_TTL = 10.0
+DASHBOARD_CACHE_TTL = 15.0
+DASHBOARD_METRIC_TYPES = ("alert", "llm", "rule", "feedback")
+DASHBOARD_TIME_RANGE = "24h"
+# Per-minute buckets: (categorical field, numeric field) summarised for each metric type
+BUCKET_FIELDS = {
+    "alert": ("severity", "response_time"),
+    "llm": ("model", "latency"),
+    "rule": ("rule_id", None),
+    "feedback": ("type", None)
+}
+# Buckets older than this are dropped; longer windows fall back to a raw log scan
+BUCKET_RETENTION = "7d"
+# Buffered frames are written once this many are pending or FLUSH_INTERVAL seconds have passed
+FLUSH_MAX_RECORDS = 64
+FLUSH_INTERVAL = 1.0
+
+# Fewest frames handed to one decrypt task, so small windows aren't split into tiny jobs
+DECRYPT_CHUNK_MIN = 256
+# Windows at least this many bytes long are memory-mapped instead of read into a buffer
+MMAP_MIN_SIZE = 1 << 20
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+def _complete_frames_end(buf: Union[bytes, memoryview], pos: int = 0) -> int:
+    """Offset just past the last complete frame in buf, walking headers from pos"""
+    header_size = _FRAME_HEADER.size
+    end = len(buf)
+    while pos + header_size <= end:
+        _, length = _FRAME_HEADER.unpack_from(buf, pos)
+        if pos + header_size + length > end:
+            break
+        pos += header_size + length
+    return pos
+
 class UsageDashboard:
     def __init__(self):
         self.storage_dir = "encrypted_metrics"
         self.encryption_key = self._get_or_create_key()
-        self.fernet = Fernet(self.encryption_key)
+        # Key file holds 32 urlsafe-b64 bytes; used raw as an AES-256-GCM key
+        self.aead = AESGCM(base64.urlsafe_b64decode(self.encryption_key)[:32])
+        # Per metric type in-memory sparse index
+        self._indexes: Dict[str, Tuple[List[float], List[int]]] = {}
+        # Per categorical field: value -> integer code used in the stats arrays
+        self._categories: Dict[str, Dict[Any, int]] = {}
+        # Cache key -> (stored at, write epoch, result); record_metric bumps the epoch
+        self._cache: Dict[Any, Tuple[float, Any, Any]] = {}
+        self._epochs: Dict[str, int] = {}
+        self._cache_lock: Optional[asyncio.Lock] = None
+        # metric_type -> minute epoch -> {"count", "sum", "labels", "label_sums"}
+        self._buckets: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        # Background bucket rebuilds, and the records that arrive while one scans the log
+        self._bucket_builds: Dict[str, asyncio.Task] = {}
+        self._bucket_backlog: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+        # Encrypted frames waiting to be written: (metric_type, timestamp, frame)
+        self._pending: List[Tuple[str, float, bytes]] = []
+        # Log size after our last successful write, per metric type
+        self._log_ends: Dict[str, int] = {}
+        self._last_flush = time.time()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Created on first use so it binds to the running loop (Python 3.9)
+        self._write_lock: Optional[asyncio.Lock] = None
+        # AES-GCM releases the GIL inside OpenSSL, so decrypts scale across threads
+        self._decrypt_workers = os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=self._decrypt_workers, thread_name_prefix="metrics-decrypt")
         self._initialize_storage()
 
     def _get_or_create_key(self) -> bytes:
@@ -24,7 +103,7 @@ class UsageDashboard:
             with open(key_file, "rb") as f:
                 return f.read()
         else:
-            key = Fernet.generate_key()
+            key = base64.urlsafe_b64encode(AESGCM.generate_key(bit_length=256))
             with open(key_file, "wb") as f:
                 f.write(key)
             return key
@@ -33,70 +112,432 @@ class UsageDashboard:
         """Initialize encrypted storage directory"""
         os.makedirs(self.storage_dir, exist_ok=True)
 
+    def _log_path(self, metric_type: str) -> str:
+        return os.path.join(self.storage_dir, f"{metric_type}.log")
+
+    def _index_path(self, metric_type: str) -> str:
+        return os.path.join(self.storage_dir, f"{metric_type}.idx")
+
+    def _load_index(self, metric_type: str) -> Tuple[List[float], List[int]]:
+        """Load the sparse (timestamp, offset) index for a metric log"""
+        index = self._indexes.get(metric_type)
+        if index is None:
+            timestamps, offsets = [], []
+            index_path = self._index_path(metric_type)
+            if os.path.exists(index_path):
+                with open(index_path, "rb") as f:
+                    raw = f.read()
+                # Ignore a torn trailing entry
+                usable = len(raw) - len(raw) % _INDEX_ENTRY.size
+                for ts, offset in _INDEX_ENTRY.iter_unpack(raw[:usable]):
+                    timestamps.append(ts)
+                    offsets.append(offset)
+            index = self._indexes[metric_type] = (timestamps, offsets)
+        return index
+
+    def _repair_tail(self, f, metric_type: str, last_offset: Optional[int]) -> int:
+        """Truncate a torn trailing frame off an open log so new frames start on a frame boundary; returns the new size"""
+        size = f.seek(0, os.SEEK_END)
+        # Index entries point at frame starts, so walking from the last one stays aligned
+        start = last_offset if last_offset is not None and last_offset <= size else 0
+        f.seek(start)
+        end = start + _complete_frames_end(f.read())
+        if end < size:
+            logger.warning(f"Truncating {size - end} torn bytes from the {metric_type} metrics log")
+            f.truncate(end)
+        return end
+
+    def _sync_write_all(self, batch: List[Tuple[str, float, bytes]],
+                        last_offsets: Dict[str, Optional[int]]) -> Dict[str, List[Tuple[float, int]]]:
+        """Append buffered frames to their logs in one write and one fdatasync per type; runs in a worker thread"""
+        by_type: Dict[str, List[Tuple[float, bytes]]] = {}
+        for metric_type, timestamp, frame in batch:
+            by_type.setdefault(metric_type, []).append((timestamp, frame))
+
+        new_entries = {}
+        for metric_type, frames in by_type.items():
+            entries = []
+            last = last_offsets.get(metric_type)
+            # Unbuffered, so a failed write can be cut back without a buffer flushing it again on close
+            with open(self._log_path(metric_type), "a+b", buffering=0) as f:
+                start = f.seek(0, os.SEEK_END)
+                if self._log_ends.get(metric_type) != start:
+                    # First write since startup, or the log changed under us: a crash may have left a torn frame
+                    start = self._repair_tail(f, metric_type, last)
+                offset = start
+                for timestamp, frame in frames:
+                    # Index a frame once the log has grown INDEX_STRIDE bytes past the last entry
+                    if last is None or offset - last >= INDEX_STRIDE:
+                        entries.append((timestamp, offset))
+                        last = offset
+                    offset += len(frame)
+                data = memoryview(b"".join(frame for _, frame in frames))
+                try:
+                    while data:
+                        data = data[f.write(data):]
+                    _fdatasync(f.fileno())
+                except BaseException:
+                    # Drop the partial batch rather than leave a torn frame ahead of later writes
+                    self._log_ends.pop(metric_type, None)
+                    f.truncate(start)
+                    raise
+                self._log_ends[metric_type] = offset
+            if entries:
+                with open(self._index_path(metric_type), "ab") as f:
+                    f.write(b"".join(_INDEX_ENTRY.pack(timestamp, offset) for timestamp, offset in entries))
+            new_entries[metric_type] = entries
+        return new_entries
+
+    async def flush(self):
+        """Write buffered metric frames to disk"""
+        async with self._get_write_lock():
+            await self._flush_locked()
+
+    async def _flush_locked(self):
+        """Write buffered metric frames to disk; caller holds the write lock"""
+        batch, self._pending = self._pending, []
+        self._last_flush = time.time()
+        if not batch:
+            return
+        last_offsets = {}
+        for metric_type in {metric_type for metric_type, _, _ in batch}:
+            offsets = self._load_index(metric_type)[1]
+            last_offsets[metric_type] = offsets[-1] if offsets else None
+
+        new_entries = await asyncio.to_thread(self._sync_write_all, batch, last_offsets)
+        for metric_type, entries in new_entries.items():
+            timestamps, offsets = self._load_index(metric_type)
+            for timestamp, offset in entries:
+                timestamps.append(timestamp)
+                offsets.append(offset)
+
+    def _ensure_flush_task(self):
+        """Start the periodic flush task if an event loop is running"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No running loop; frames stay buffered until flush()
+            return
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Periodically write buffered frames"""
+        while True:
+            try:
+                await asyncio.sleep(FLUSH_INTERVAL)
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in metrics flush loop: {str(e)}")
+
+    def _get_write_lock(self) -> asyncio.Lock:
+        # Created on first use so it binds to the running loop (Python 3.9)
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+
+    def _add_to_bucket(self, buckets: Dict[int, Dict[str, Any]], metric_type: str,
+                       timestamp: float, data: Dict[str, Any]):
+        """Fold one metric into its per-minute bucket"""
+        label_field, value_field = BUCKET_FIELDS[metric_type]
+        minute = int(timestamp // 60)
+        bucket = buckets.get(minute)
+        if bucket is None:
+            bucket = buckets[minute] = {"count": 0, "sum": 0.0, "labels": Counter(), "label_sums": Counter()}
+            # Buckets are created in time order, so expired ones sit at the front
+            oldest = minute - int(self._parse_time_range(BUCKET_RETENTION) // 60)
+            while next(iter(buckets)) < oldest:
+                del buckets[next(iter(buckets))]
+
+        value = data.get(value_field, 0) if value_field else 0
+        label = data.get(label_field, "unknown")
+        bucket["count"] += 1
+        bucket["sum"] += value
+        bucket["labels"][label] += 1
+        bucket["label_sums"][label] += value
+
+    def _start_bucket_build(self, metric_type: str) -> asyncio.Task:
+        """Start rebuilding a type's buckets in the background, unless a rebuild is already running"""
+        task = self._bucket_builds.get(metric_type)
+        if task is None:
+            task = self._bucket_builds[metric_type] = asyncio.get_running_loop().create_task(
+                self._build_buckets(metric_type)
+            )
+        return task
+
+    async def _build_buckets(self, metric_type: str):
+        """Rebuild a type's buckets with one sequential scan of its log, outside the write lock"""
+        try:
+            async with self._get_write_lock():
+                # Everything recorded so far lands below `end`; later records queue in the backlog
+                await self._flush_locked()
+                try:
+                    end = os.path.getsize(self._log_path(metric_type))
+                except FileNotFoundError:
+                    end = 0
+                self._bucket_backlog[metric_type] = []
+
+            buckets: Dict[int, Dict[str, Any]] = {}
+            for metric in await self._read_metrics(metric_type, BUCKET_RETENTION, end):
+                self._add_to_bucket(buckets, metric_type, metric["timestamp"], metric["data"])
+            # No await from here on, so no record can slip in between the replay and the swap
+            for timestamp, data in self._bucket_backlog.pop(metric_type):
+                self._add_to_bucket(buckets, metric_type, timestamp, data)
+            self._buckets[metric_type] = buckets
+        except Exception as e:
+            # The backlog is on disk by the next attempt, which rescans it
+            logger.error(f"Failed to build {metric_type} metric buckets: {str(e)}")
+        finally:
+            self._bucket_backlog.pop(metric_type, None)
+            self._bucket_builds.pop(metric_type, None)
+
+    async def _window_summary(self, metric_type: str, time_range: str) -> Dict[str, Any]:
+        """Add up the per-minute buckets covering a time range"""
+        if metric_type not in self._buckets:
+            # Shielded: a cancelled dashboard request shouldn't abort the shared rebuild
+            await asyncio.shield(self._start_bucket_build(metric_type))
+            if metric_type not in self._buckets:
+                raise RuntimeError(f"No {metric_type} metric buckets")
+
+        first_minute = int((time.time() - self._parse_time_range(time_range)) // 60)
+        summary = {"count": 0, "sum": 0.0, "labels": Counter(), "label_sums": Counter()}
+        for minute, bucket in self._buckets[metric_type].items():
+            if minute >= first_minute:
+                summary["count"] += bucket["count"]
+                summary["sum"] += bucket["sum"]
+                summary["labels"].update(bucket["labels"])
+                summary["label_sums"].update(bucket["label_sums"])
+        return summary
+
+    async def close(self):
+        """Stop the flush task and bucket rebuilds, write any buffered frames, then release the decrypt workers"""
+        tasks = [self._flush_task, *self._bucket_builds.values()]
+        self._flush_task = None
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self.flush()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
     async def record_metric(self, metric_type: str, data: Dict[str, Any]):
         """Record a metric with encryption"""
         try:
-            timestamp = datetime.now().isoformat()
+            now = time.time()
             metric_data = {
-                "timestamp": timestamp,
+                "timestamp": now,
                 "type": metric_type,
                 "data": data
             }
 
-            # Encrypt the metric data
-            encrypted_data = self.fernet.encrypt(json.dumps(metric_data).encode())
+            # Encrypt the metric data: nonce || ciphertext+tag
+            nonce = os.urandom(NONCE_SIZE)
+            payload = msgpack.packb(metric_data, use_bin_type=True)
+            encrypted_data = nonce + self.aead.encrypt(nonce, payload, None)
+            frame = _FRAME_HEADER.pack(now, len(encrypted_data)) + encrypted_data
+
+            # Buffer the frame; the log write happens in flush()
+            async with self._get_write_lock():
+                self._pending.append((metric_type, now, frame))
+                self._epochs[metric_type] = self._epochs.get(metric_type, 0) + 1
+                if metric_type in self._buckets:
+                    self._add_to_bucket(self._buckets[metric_type], metric_type, now, data)
+                elif metric_type in self._bucket_backlog:
+                    self._bucket_backlog[metric_type].append((now, data))
+                elif metric_type in BUCKET_FIELDS:
+                    # Frames recorded before the rebuild takes its snapshot are flushed and scanned by it
+                    self._start_bucket_build(metric_type)
 
-            # Save to file
-            filename = f"{self.storage_dir}/{metric_type}_{timestamp}.enc"
-            async with aiofiles.open(filename, "wb") as f:
-                await f.write(encrypted_data)
+            if len(self._pending) >= FLUSH_MAX_RECORDS or now - self._last_flush > FLUSH_INTERVAL:
+                await self.flush()
+            else:
+                self._ensure_flush_task()
 
             logger.info(f"Recorded metric: {metric_type}")
         except Exception as e:
             logger.error(f"Failed to record metric: {str(e)}")
 
+    def _cache_get(self, key: Any, epoch: Any, ttl: float) -> Any:
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] == epoch and time.monotonic() - entry[0] < ttl:
+            return entry[2]
+        return None
+
+    def _cache_put(self, key: Any, epoch: Any, value: Any):
+        self._cache[key] = (time.monotonic(), epoch, value)
+
     async def get_metrics(self, metric_type: str, time_range: str = "24h") -> List[Dict[str, Any]]:
         """Get metrics of a specific type within a time range"""
+        key = (metric_type, time_range)
+        epoch = self._epochs.get(metric_type, 0)
+        ttl = METRICS_CACHE_TTL.get(time_range, DEFAULT_METRICS_CACHE_TTL)
+        cached = self._cache_get(key, epoch, ttl)
+        if cached is not None:
+            return list(cached)
+
+        # Make buffered frames visible to the read
+        await self.flush()
+        metrics = await self._read_metrics(metric_type, time_range)
+        self._cache_put(key, epoch, metrics)
+        return list(metrics)
+
+    async def _read_metrics(self, metric_type: str, time_range: str,
+                            stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read and decrypt metrics of a specific type within a time range from the log, up to byte `stop`"""
         try:
             metrics = []
-            cutoff_time = datetime.now() - self._parse_time_range(time_range)
-
-            # List all encrypted files
-            for filename in os.listdir(self.storage_dir):
-                if filename.startswith(metric_type) and filename.endswith(".enc"):
-                    file_path = os.path.join(self.storage_dir, filename)
-                    
-                    # Read and decrypt file
-                    async with aiofiles.open(file_path, "rb") as f:
-                        encrypted_data = await f.read()
-                        decrypted_data = self.fernet.decrypt(encrypted_data)
-                        metric = json.loads(decrypted_data.decode())
-
-                        # Filter by time range
-                        metric_time = datetime.fromisoformat(metric["timestamp"])
-                        if metric_time >= cutoff_time:
-                            metrics.append(metric)
-
-            return sorted(metrics, key=lambda x: x["timestamp"])
+            cutoff = time.time() - self._parse_time_range(time_range)
+            log_path = self._log_path(metric_type)
+            try:
+                st = os.stat(log_path)
+            except FileNotFoundError:
+                return metrics
+            # Nothing was appended since the window opened; skip the open and read entirely
+            if st.st_mtime < cutoff:
+                return metrics
+
+            # Bisect the sparse index to the last entry at or before the cutoff
+            timestamps, offsets = self._load_index(metric_type)
+            i = bisect_right(timestamps, cutoff) - 1
+            start = offsets[i] if i >= 0 else 0
+            size = st.st_size if stop is None else min(st.st_size, stop)
+            if size <= start:
+                return metrics
+
+            mm = None
+            if size - start >= MMAP_MIN_SIZE:
+                # Large windows decrypt straight out of the page cache through zero-copy slices
+                mm = await asyncio.to_thread(self._map_log, log_path)
+                buf, pos, end = memoryview(mm), start, min(len(mm), size)
+            else:
+                async with aiofiles.open(log_path, "rb") as f:
+                    await f.seek(start)
+                    buf = await f.read(size - start)
+                    pos, end = 0, len(buf)
+
+            try:
+                # Walk frame headers sequentially; only in-window frames get decrypted
+                spans = []
+                header_size = _FRAME_HEADER.size
+                while pos + header_size <= end:
+                    ts, length = _FRAME_HEADER.unpack_from(buf, pos)
+                    pos += header_size
+                    if pos + length > end:
+                        break  # torn trailing frame
+                    if ts >= cutoff:
+                        spans.append((pos, pos + length))
+                    pos += length
+                if not spans:
+                    return metrics
+
+                # Fan decrypt + unpack out over the pool in contiguous chunks to keep order
+                loop = asyncio.get_running_loop()
+                chunk = max(-(-len(spans) // self._decrypt_workers), DECRYPT_CHUNK_MIN)
+                parts = await asyncio.gather(*(
+                    loop.run_in_executor(self._pool, self._decrypt_frames, buf, spans[i:i + chunk])
+                    for i in range(0, len(spans), chunk)
+                ))
+                for part in parts:
+                    metrics.extend(part)
+                return metrics
+            finally:
+                if mm is not None:
+                    buf.release()
+                    mm.close()
         except Exception as e:
             logger.error(f"Failed to get metrics: {str(e)}")
             return []
 
-    async def get_dashboard_data(self) -> Dict[str, Any]:
-        """Get aggregated dashboard data"""
+    @staticmethod
+    def _map_log(log_path: str) -> mmap.mmap:
+        """Map a metric log read-only; runs in a worker thread"""
+        fd = os.open(log_path, os.O_RDONLY)
+        try:
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            # The mapping holds its own reference to the file
+            os.close(fd)
+
+    def _decrypt_frames(self, buf: Union[bytes, memoryview], spans: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Decrypt and unpack the frames at the given spans of a log buffer; runs in the pool"""
+        decrypt = self.aead.decrypt
+        metrics = []
+        for start, stop in spans:
+            try:
+                decrypted_data = decrypt(buf[start:start + NONCE_SIZE], buf[start + NONCE_SIZE:stop], None)
+            except InvalidTag:
+                # A corrupt frame costs only itself, not the rest of the window
+                logger.warning("Skipping metrics frame that failed authentication")
+                continue
+            metrics.append(msgpack.unpackb(decrypted_data, raw=False))
+        return metrics
+
+    async def get_dashboard_data(self, time_range: str = DASHBOARD_TIME_RANGE) -> Dict[str, Any]:
+        """Get aggregated dashboard data for a time range"""
+        key = ("dashboard", time_range)
+        epoch = tuple(self._epochs.get(metric_type, 0) for metric_type in DASHBOARD_METRIC_TYPES)
+        cached = self._cache_get(key, epoch, DASHBOARD_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+        # Concurrent viewers wait for one computation instead of each rescanning the logs
+        if self._cache_lock is None:
+            self._cache_lock = asyncio.Lock()
+        async with self._cache_lock:
+            cached = self._cache_get(key, epoch, DASHBOARD_CACHE_TTL)
+            if cached is None:
+                cached = await self._compute_dashboard_data(time_range)
+                if cached:
+                    self._cache_put(key, epoch, cached)
+            return cached
+
+    async def _compute_dashboard_data(self, time_range: str) -> Dict[str, Any]:
+        """Read the metric windows and aggregate them into dashboard statistics"""
         try:
-            # Get metrics for different types
-            alert_metrics = await self.get_metrics("alert")
-            llm_metrics = await self.get_metrics("llm")
-            rule_metrics = await self.get_metrics("rule")
-            feedback_metrics = await self.get_metrics("feedback")
+            if self._parse_time_range(time_range) > self._parse_time_range(BUCKET_RETENTION):
+                # Window reaches past the buckets: aggregate raw metrics instead
+                return {
+                    "alerts": self._calculate_alert_stats(await self.get_metrics("alert", time_range)),
+                    "llm": self._calculate_llm_stats(await self.get_metrics("llm", time_range)),
+                    "rules": self._calculate_rule_stats(await self.get_metrics("rule", time_range)),
+                    "feedback": self._calculate_feedback_stats(await self.get_metrics("feedback", time_range)),
+                    "generated_at": self.format_timestamp(time.time())
+                }
+
+            # Add up pre-aggregated per-minute buckets: cost depends on window length, not event count
+            alerts = await self._window_summary("alert", time_range)
+            llm = await self._window_summary("llm", time_range)
+            rules = await self._window_summary("rule", time_range)
+            feedback = await self._window_summary("feedback", time_range)
 
-            # Calculate statistics
             stats = {
-                "alerts": self._calculate_alert_stats(alert_metrics),
-                "llm": self._calculate_llm_stats(llm_metrics),
-                "rules": self._calculate_rule_stats(rule_metrics),
-                "feedback": self._calculate_feedback_stats(feedback_metrics)
+                "alerts": {
+                    "total_alerts": alerts["count"],
+                    "severity_distribution": dict(alerts["labels"]),
+                    "avg_response_time": alerts["sum"] / alerts["count"]
+                } if alerts["count"] else {},
+                "llm": {
+                    "total_requests": llm["count"],
+                    "model_stats": {
+                        model: {"count": count, "avg_latency": llm["label_sums"][model] / count}
+                        for model, count in llm["labels"].items()
+                    }
+                } if llm["count"] else {},
+                "rules": {
+                    "total_matches": rules["count"],
+                    "rule_distribution": dict(rules["labels"])
+                } if rules["count"] else {},
+                "feedback": {
+                    "total_feedback": feedback["count"],
+                    "feedback_distribution": dict(feedback["labels"])
+                } if feedback["count"] else {},
+                "generated_at": self.format_timestamp(time.time())
             }
 
             return stats
@@ -104,38 +545,59 @@ class UsageDashboard:
             logger.error(f"Failed to get dashboard data: {str(e)}")
             return {}
 
-    def _parse_time_range(self, time_range: str) -> timedelta:
-        """Parse time range string to timedelta"""
+    def _parse_time_range(self, time_range: str) -> float:
+        """Parse time range string to seconds, for comparison against epoch timestamps"""
         unit = time_range[-1]
         value = int(time_range[:-1])
         
         if unit == "h":
-            return timedelta(hours=value)
+            return timedelta(hours=value).total_seconds()
         elif unit == "d":
-            return timedelta(days=value)
+            return timedelta(days=value).total_seconds()
         elif unit == "w":
-            return timedelta(weeks=value)
+            return timedelta(weeks=value).total_seconds()
         else:
-            return timedelta(hours=24)  # default to 24h
+            return timedelta(hours=24).total_seconds()  # default to 24h
+
+    @staticmethod
+    def format_timestamp(timestamp: float) -> str:
+        """Render an epoch timestamp as ISO-8601 for display"""
+        return datetime.fromtimestamp(timestamp).isoformat()
+
+    def _encode(self, field: str, values: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+        """Map categorical values to stable integer codes; returns (codes, labels by code)"""
+        codes_map = self._categories.setdefault(field, {})
+        codes = np.fromiter(
+            (codes_map.setdefault(value, len(codes_map)) for value in values),
+            dtype=np.int32,
+            count=len(values)
+        )
+        return codes, list(codes_map)
+
+    @staticmethod
+    def _column(datas: List[Dict[str, Any]], key: str) -> np.ndarray:
+        """Pull a numeric field out of every record into a contiguous float64 array"""
+        return np.fromiter((data.get(key, 0) for data in datas), dtype=np.float64, count=len(datas))
+
+    @staticmethod
+    def _distribution(counts: np.ndarray, labels: List[Any]) -> Dict[Any, int]:
+        return {labels[code]: int(count) for code, count in enumerate(counts) if count}
 
     def _calculate_alert_stats(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate alert statistics"""
         if not metrics:
             return {}
 
-        total_alerts = len(metrics)
-        severity_counts = defaultdict(int)
-        avg_response_time = 0
-
-        for metric in metrics:
-            data = metric["data"]
-            severity_counts[data.get("severity", "unknown")] += 1
-            avg_response_time += data.get("response_time", 0)
+        datas = [metric["data"] for metric in metrics]
+        severity_codes, labels = self._encode(
+            "alert.severity", [data.get("severity", "unknown") for data in datas]
+        )
+        response_times = self._column(datas, "response_time")
 
         return {
-            "total_alerts": total_alerts,
-            "severity_distribution": dict(severity_counts),
-            "avg_response_time": avg_response_time / total_alerts if total_alerts > 0 else 0
+            "total_alerts": len(datas),
+            "severity_distribution": self._distribution(histogram(severity_codes, len(labels)), labels),
+            "avg_response_time": float(response_times.mean())
         }
 
     def _calculate_llm_stats(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -143,22 +605,19 @@ class UsageDashboard:
         if not metrics:
             return {}
 
-        model_stats = defaultdict(lambda: {"count": 0, "total_latency": 0})
-        
-        for metric in metrics:
-            data = metric["data"]
-            model = data.get("model", "unknown")
-            model_stats[model]["count"] += 1
-            model_stats[model]["total_latency"] += data.get("latency", 0)
+        datas = [metric["data"] for metric in metrics]
+        model_codes, labels = self._encode("llm.model", [data.get("model", "unknown") for data in datas])
+        latencies = self._column(datas, "latency")
+        counts, total_latency = llm_reduce(model_codes, latencies, len(labels))
 
         return {
-            "total_requests": len(metrics),
+            "total_requests": len(datas),
             "model_stats": {
-                model: {
-                    "count": stats["count"],
-                    "avg_latency": stats["total_latency"] / stats["count"] if stats["count"] > 0 else 0
+                labels[code]: {
+                    "count": int(counts[code]),
+                    "avg_latency": float(total_latency[code] / counts[code])
                 }
-                for model, stats in model_stats.items()
+                for code in np.flatnonzero(counts)
             }
         }
 
@@ -167,18 +626,13 @@ class UsageDashboard:
         if not metrics:
             return {}
 
-        rule_counts = defaultdict(int)
-        total_matches = 0
-
-        for metric in metrics:
-            data = metric["data"]
-            rule_id = data.get("rule_id", "unknown")
-            rule_counts[rule_id] += 1
-            total_matches += 1
+        rule_codes, labels = self._encode(
+            "rule.rule_id", [metric["data"].get("rule_id", "unknown") for metric in metrics]
+        )
 
         return {
-            "total_matches": total_matches,
-            "rule_distribution": dict(rule_counts)
+            "total_matches": len(metrics),
+            "rule_distribution": self._distribution(histogram(rule_codes, len(labels)), labels)
         }
 
     def _calculate_feedback_stats(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -186,15 +640,11 @@ class UsageDashboard:
         if not metrics:
             return {}
 
-        feedback_counts = defaultdict(int)
-        total_feedback = len(metrics)
-
-        for metric in metrics:
-            data = metric["data"]
-            feedback_type = data.get("type", "unknown")
-            feedback_counts[feedback_type] += 1
+        feedback_codes, labels = self._encode(
+            "feedback.type", [metric["data"].get("type", "unknown") for metric in metrics]
+        )
 
         return {
-            "total_feedback": total_feedback,
-            "feedback_distribution": dict(feedback_counts)
-        } 
\ No newline at end of file
+            "total_feedback": len(metrics),
+            "feedback_distribution": self._distribution(histogram(feedback_codes, len(labels)), labels)
+        }
@@ -1,38 +1,91 @@
 import logging
 import traceback
 import sys
-from typing import Dict, Any, Optional, Type, Callable
+import asyncio
+import inspect
+import random
+import time
+from typing import Dict, Any, Optional, Type, Callable, Tuple, NamedTuple
+from types import TracebackType
 from datetime import datetime
 from functools import wraps
-import json
-from dataclasses import dataclass, asdict
+import orjson
+from dataclasses import dataclass, field
 from .metrics import PerformanceMetrics, SecurityMetrics
 
 logger = logging.getLogger(__name__)
 
+ExcInfo = Tuple[Type[BaseException], BaseException, Optional[TracebackType]]
+
+# Only these severities carry the formatted stack in their log record
+TRACE_SEVERITIES = frozenset({'error', 'critical'})
+
+# Error types that also count as suspicious activity
+SECURITY_ERROR_TYPES = frozenset({'AuthenticationError', 'AuthorizationError', 'SecurityError'})
+
+# Upper bound of the random jitter added to each recovery backoff, in seconds
+RECOVERY_JITTER = 0.1
+
 @dataclass
 class ErrorContext:
     """Context information for an error"""
     error_type: str
     error_message: str
-    stack_trace: str
-    timestamp: datetime
+    stack_trace: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
     request_id: Optional[str] = None
     user_id: Optional[str] = None
     endpoint: Optional[str] = None
     request_data: Optional[Dict[str, Any]] = None
     system_state: Optional[Dict[str, Any]] = None
     additional_info: Optional[Dict[str, Any]] = None
+    exc_info: Optional[ExcInfo] = field(default=None, repr=False)
+
+    def _get_stack_trace(self) -> str:
+        """Formatted traceback; built from exc_info on first access unless one was passed in"""
+        if self._stack_trace is None:
+            self._stack_trace = (
+                '' if self.exc_info is None else ''.join(traceback.format_exception(*self.exc_info))
+            )
+        return self._stack_trace
+
+    def _set_stack_trace(self, stack_trace: Optional[str]):
+        self._stack_trace = stack_trace
+
+# Installed after @dataclass so the generated __init__ still takes stack_trace and assigns it through the setter
+ErrorContext.stack_trace = property(ErrorContext._get_stack_trace, ErrorContext._set_stack_trace)
+
+async def _await(awaitable):
+    return await awaitable
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+class Pattern(NamedTuple):
+    """Handling strategy registered for an error type"""
+    severity: str
+    recovery_strategy: Optional[Callable] = None
+    callback: Optional[Callable] = None
 
 class ErrorHandler:
     """Advanced error handling system"""
     
     def __init__(self):
-        self.error_patterns: Dict[str, Dict[str, Any]] = {}
+        self.error_patterns: Dict[str, Pattern] = {}
         self.recovery_strategies: Dict[str, Callable] = {}
         self.error_callbacks: Dict[str, Callable] = {}
         self.max_retries = 3
         self.retry_delay = 1  # seconds
+        # Logger method per pattern severity; unknown severities log at info
+        self._severity_log: Dict[str, Callable] = {
+            'critical': logger.critical,
+            'error': logger.error,
+            'warning': logger.warning
+        }
         
     def register_error_pattern(
         self,
@@ -42,13 +95,30 @@ class ErrorHandler:
         callback: Optional[Callable] = None
     ):
         """Register an error pattern with its handling strategy"""
-        self.error_patterns[pattern] = {
-            'severity': severity,
-            'recovery_strategy': recovery_strategy,
-            'callback': callback
-        }
+        # Interned so lookups by type(error).__name__ hit the identity fast path
+        self.error_patterns[sys.intern(pattern)] = Pattern(severity, recovery_strategy, callback)
         
-    def handle_error(
+    def _create_context(self, error: Exception, context: Optional[Dict[str, Any]]) -> ErrorContext:
+        """Build the context for an error, leaving the stack trace unformatted"""
+        return ErrorContext(
+            error_type=type(error).__name__,
+            error_message=str(error),
+            timestamp=datetime.utcnow(),
+            exc_info=(type(error), error, error.__traceback__),
+            **(context or {})
+        )
+    
+    def _handler_error_context(self, e: Exception) -> ErrorContext:
+        """Context returned when the error handler itself fails"""
+        logger.error("Error in error handler", exc_info=True)
+        return ErrorContext(
+            error_type="ErrorHandlerError",
+            error_message=str(e),
+            timestamp=datetime.utcnow(),
+            exc_info=(type(e), e, e.__traceback__)
+        )
+        
+    async def handle_error(
         self,
         error: Exception,
         context: Optional[Dict[str, Any]] = None
@@ -56,13 +126,7 @@ class ErrorHandler:
         """Handle an error with context"""
         try:
             # Create error context
-            error_context = ErrorContext(
-                error_type=type(error).__name__,
-                error_message=str(error),
-                stack_trace=traceback.format_exc(),
-                timestamp=datetime.utcnow(),
-                **(context or {})
-            )
+            error_context = self._create_context(error, context)
             
             # Log error
             self._log_error(error_context)
@@ -72,7 +136,7 @@ class ErrorHandler:
             
             # Try recovery
             if self._should_attempt_recovery(error_context):
-                self._attempt_recovery(error_context)
+                await self._attempt_recovery(error_context)
             
             # Execute callback if registered
             self._execute_callback(error_context)
@@ -80,34 +144,57 @@ class ErrorHandler:
             return error_context
             
         except Exception as e:
-            logger.error("Error in error handler", exc_info=True)
-            return ErrorContext(
-                error_type="ErrorHandlerError",
-                error_message=str(e),
-                stack_trace=traceback.format_exc(),
-                timestamp=datetime.utcnow()
-            )
+            return self._handler_error_context(e)
+    
+    def handle_error_sync(
+        self,
+        error: Exception,
+        context: Optional[Dict[str, Any]] = None
+    ) -> ErrorContext:
+        """Blocking variant of handle_error for sync call sites; recovery runs on the caller's thread"""
+        try:
+            error_context = self._create_context(error, context)
+            
+            self._log_error(error_context)
+            
+            self._update_metrics(error_context)
+            
+            if self._should_attempt_recovery(error_context):
+                self._attempt_recovery_sync(error_context)
+            
+            self._execute_callback(error_context)
+            
+            return error_context
+            
+        except Exception as e:
+            return self._handler_error_context(e)
     
     def _log_error(self, error_context: ErrorContext):
         """Log error with context"""
         try:
-            log_data = asdict(error_context)
-            log_data['timestamp'] = log_data['timestamp'].isoformat()
+            # ErrorContext has a fixed shape; build the dict directly instead of asdict() recursion
+            log_data = {
+                'error_type': error_context.error_type,
+                'error_message': error_context.error_message,
+                'timestamp': error_context.timestamp,
+                'request_id': error_context.request_id,
+                'user_id': error_context.user_id,
+                'endpoint': error_context.endpoint,
+                'request_data': error_context.request_data,
+                'system_state': error_context.system_state,
+                'additional_info': error_context.additional_info
+            }
             
-            if error_context.error_type in self.error_patterns:
-                pattern = self.error_patterns[error_context.error_type]
-                severity = pattern['severity']
-                
-                if severity == 'critical':
-                    logger.critical(json.dumps(log_data))
-                elif severity == 'error':
-                    logger.error(json.dumps(log_data))
-                elif severity == 'warning':
-                    logger.warning(json.dumps(log_data))
-                else:
-                    logger.info(json.dumps(log_data))
-            else:
-                logger.error(json.dumps(log_data))
+            pattern = self.error_patterns.get(error_context.error_type)
+            severity = 'error' if pattern is None else pattern.severity
+            
+            # Formatting the stack walks frames and reads source files; skip it for low severities
+            if severity in TRACE_SEVERITIES:
+                log_data['stack_trace'] = error_context.stack_trace
+            
+            log = self._severity_log.get(severity, logger.info)
+            # orjson serializes the datetime natively; default=str covers arbitrary context values
+            log(orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode())
                 
         except Exception as e:
             logger.error("Error logging error context", exc_info=True)
@@ -122,11 +209,7 @@ class ErrorHandler:
             )
             
             # Update security metrics if applicable
-            if error_context.error_type in [
-                'AuthenticationError',
-                'AuthorizationError',
-                'SecurityError'
-            ]:
+            if error_context.error_type in SECURITY_ERROR_TYPES:
                 SecurityMetrics.update_suspicious_activities(
                     1,
                     error_context.error_type
@@ -138,25 +221,27 @@ class ErrorHandler:
     def _should_attempt_recovery(self, error_context: ErrorContext) -> bool:
         """Determine if recovery should be attempted"""
         try:
-            if error_context.error_type not in self.error_patterns:
-                return False
-                
-            pattern = self.error_patterns[error_context.error_type]
-            return pattern['recovery_strategy'] is not None
+            pattern = self.error_patterns.get(error_context.error_type)
+            return pattern is not None and pattern.recovery_strategy is not None
             
         except Exception as e:
             logger.error("Error checking recovery possibility", exc_info=True)
             return False
     
-    def _attempt_recovery(self, error_context: ErrorContext):
+    def _recovery_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so concurrent recoveries don't retry in lockstep"""
+        return self.retry_delay * 2 ** attempt + random.random() * RECOVERY_JITTER
+    
+    async def _attempt_recovery(self, error_context: ErrorContext):
         """Attempt to recover from error"""
         try:
-            pattern = self.error_patterns[error_context.error_type]
-            recovery_strategy = pattern['recovery_strategy']
+            recovery_strategy = self.error_patterns[error_context.error_type].recovery_strategy
             
             for attempt in range(self.max_retries):
                 try:
-                    recovery_strategy(error_context)
+                    result = recovery_strategy(error_context)
+                    if inspect.isawaitable(result):
+                        await result
                     logger.info(
                         f"Recovery successful for {error_context.error_type} "
                         f"on attempt {attempt + 1}"
@@ -167,7 +252,46 @@ class ErrorHandler:
                         logger.warning(
                             f"Recovery attempt {attempt + 1} failed, retrying..."
                         )
-                        time.sleep(self.retry_delay * (attempt + 1))
+                        await asyncio.sleep(self._recovery_delay(attempt))
+                    else:
+                        logger.error(
+                            f"All recovery attempts failed for "
+                            f"{error_context.error_type}"
+                        )
+                        
+        except Exception as e:
+            logger.error("Error in recovery attempt", exc_info=True)
+    
+    def _attempt_recovery_sync(self, error_context: ErrorContext):
+        """Attempt to recover from error, backing off with blocking sleeps"""
+        try:
+            recovery_strategy = self.error_patterns[error_context.error_type].recovery_strategy
+            
+            for attempt in range(self.max_retries):
+                try:
+                    result = recovery_strategy(error_context)
+                    if inspect.isawaitable(result):
+                        if _loop_running():
+                            # Can't block on a coroutine from inside the loop that has to run it
+                            if inspect.iscoroutine(result):
+                                result.close()
+                            logger.error(
+                                f"Async recovery strategy for {error_context.error_type} "
+                                f"needs handle_error when an event loop is running"
+                            )
+                            return
+                        asyncio.run(_await(result))
+                    logger.info(
+                        f"Recovery successful for {error_context.error_type} "
+                        f"on attempt {attempt + 1}"
+                    )
+                    return
+                except Exception as e:
+                    if attempt < self.max_retries - 1:
+                        logger.warning(
+                            f"Recovery attempt {attempt + 1} failed, retrying..."
+                        )
+                        time.sleep(self._recovery_delay(attempt))
                     else:
                         logger.error(
                             f"All recovery attempts failed for "
@@ -180,12 +304,9 @@ class ErrorHandler:
     def _execute_callback(self, error_context: ErrorContext):
         """Execute registered callback for error"""
         try:
-            if error_context.error_type in self.error_patterns:
-                pattern = self.error_patterns[error_context.error_type]
-                callback = pattern['callback']
-                
-                if callback:
-                    callback(error_context)
+            pattern = self.error_patterns.get(error_context.error_type)
+            if pattern is not None and pattern.callback:
+                pattern.callback(error_context)
                     
         except Exception as e:
             logger.error("Error executing error callback", exc_info=True)
@@ -193,19 +314,31 @@ class ErrorHandler:
 def handle_errors(error_handler: ErrorHandler):
     """Decorator for handling errors in functions"""
     def decorator(func):
+        def call_context(args, kwargs) -> Dict[str, Any]:
+            return {
+                'endpoint': func.__name__,
+                'request_data': {
+                    'args': str(args),
+                    'kwargs': str(kwargs)
+                }
+            }
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    await error_handler.handle_error(e, call_context(args, kwargs))
+                    raise
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                context = {
-                    'endpoint': func.__name__,
-                    'request_data': {
-                        'args': str(args),
-                        'kwargs': str(kwargs)
-                    }
-                }
-                error_handler.handle_error(e, context)
+                error_handler.handle_error_sync(e, call_context(args, kwargs))
                 raise
         return wrapper
     return decorator
@@ -1,32 +1,62 @@
 from django.contrib import admin
 from .models import Patient, MedicalRecord, Appointment, Prescription, LabResult
 
+# Columns needed to render str(patient) in a list row
+PATIENT_LABEL_FIELDS = (
+    'patient', 'patient__mrn', 'patient__user', 'patient__user__first_name', 'patient__user__last_name'
+)
+
+class ChangelistOnlyMixin:
+    """Join list relations up front and load only the listed columns on the changelist"""
+    related_fields = ()
+    changelist_fields = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.related_fields:
+            queryset = queryset.select_related(*self.related_fields)
+        # Change forms need every field; only trim the listing query
+        match = getattr(request, 'resolver_match', None)
+        if self.changelist_fields and match and (match.url_name or '').endswith('_changelist'):
+            queryset = queryset.only(*self.changelist_fields)
+        return queryset
+
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
+class PatientAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('user', 'mrn', 'date_of_birth', 'gender', 'phone_number')
     search_fields = ('user__username', 'user__email', 'mrn')
     list_filter = ('gender', 'created_at')
+    related_fields = ('user',)
+    changelist_fields = ('user', 'user__username', 'mrn', 'date_of_birth', 'gender', 'phone_number')
 
 @admin.register(MedicalRecord)
-class MedicalRecordAdmin(admin.ModelAdmin):
+class MedicalRecordAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('patient', 'created_at', 'updated_at')
     search_fields = ('patient__user__username', 'diagnosis', 'treatment')
     list_filter = ('created_at', 'updated_at')
+    related_fields = ('patient__user',)
+    changelist_fields = PATIENT_LABEL_FIELDS + ('created_at', 'updated_at')
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('patient', 'date_time', 'status', 'reason')
     search_fields = ('patient__user__username', 'reason', 'notes')
     list_filter = ('status', 'date_time', 'created_at')
+    related_fields = ('patient__user',)
+    changelist_fields = PATIENT_LABEL_FIELDS + ('date_time', 'status', 'reason', 'created_at')
 
 @admin.register(Prescription)
-class PrescriptionAdmin(admin.ModelAdmin):
+class PrescriptionAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('patient', 'medication', 'dosage', 'start_date', 'end_date')
     search_fields = ('patient__user__username', 'medication', 'notes')
     list_filter = ('start_date', 'end_date', 'created_at')
+    related_fields = ('patient__user',)
+    changelist_fields = PATIENT_LABEL_FIELDS + ('medication', 'dosage', 'start_date', 'end_date')
 
 @admin.register(LabResult)
-class LabResultAdmin(admin.ModelAdmin):
+class LabResultAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('patient', 'test_name', 'date', 'result')
     search_fields = ('patient__user__username', 'test_name', 'result')
     list_filter = ('date', 'created_at')
+    related_fields = ('patient__user',)
+    changelist_fields = PATIENT_LABEL_FIELDS + ('test_name', 'date', 'result')
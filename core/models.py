@@ -13,6 +13,12 @@ class Patient(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # mrn is already indexed by its unique constraint
+        indexes = [
+            models.Index(fields=['gender']),
+        ]
+
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.mrn}"
 
@@ -26,6 +32,11 @@ class MedicalRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', '-created_at']),
+        ]
+
     def __str__(self):
         return f"Record for {self.patient} - {self.created_at}"
 
@@ -45,6 +56,12 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'date_time']),
+            models.Index(fields=['status', 'date_time']),
+        ]
+
     def __str__(self):
         return f"Appointment for {self.patient} on {self.date_time}"
 
@@ -59,6 +76,11 @@ class Prescription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'start_date']),
+        ]
+
     def __str__(self):
         return f"{self.medication} for {self.patient}"
 
@@ -72,5 +94,10 @@ class LabResult(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'date']),
+        ]
+
     def __str__(self):
         return f"{self.test_name} for {self.patient} on {self.date}"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db import connection, transaction
 from .models import Patient, MedicalRecord, Appointment, Prescription, LabResult
 
 class UserSerializer(serializers.ModelSerializer):
@@ -8,6 +9,35 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('id', 'username', 'email', 'first_name', 'last_name')
         read_only_fields = ('id',)
 
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+class PatientListSerializer(serializers.ListSerializer):
+    """Create a batch of patients with one INSERT per table inside a single transaction"""
+
+    def create(self, validated_data):
+        users = []
+        for item in validated_data:
+            # Mirror create_user, since bulk_create skips save(): normalized username/email,
+            # and the password hashed here (no password leaves it unusable)
+            user = User(**{field: item.pop(field) for field in USER_FIELDS})
+            user.username = User.normalize_username(user.username)
+            user.email = User.objects.normalize_email(user.email)
+            user.set_password(item.pop('password', None))
+            users.append(user)
+
+        with transaction.atomic():
+            if not connection.features.can_return_rows_from_bulk_insert:
+                # Without RETURNING (e.g. MySQL) bulk_create leaves the user pks unset
+                patients = []
+                for user, item in zip(users, validated_data):
+                    user.save()
+                    patients.append(Patient.objects.create(user=user, **item))
+                return patients
+            users = User.objects.bulk_create(users)
+            return Patient.objects.bulk_create(
+                [Patient(user=user, **item) for user, item in zip(users, validated_data)]
+            )
+
 class PatientSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     first_name = serializers.CharField(write_only=True)
@@ -19,21 +49,16 @@ class PatientSerializer(serializers.ModelSerializer):
         model = Patient
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at', 'user')
+        list_serializer_class = PatientListSerializer
     
     def create(self, validated_data):
         # Extract user data
-        user_data = {
-            'username': validated_data.pop('username'),
-            'email': validated_data.pop('email'),
-            'first_name': validated_data.pop('first_name'),
-            'last_name': validated_data.pop('last_name'),
-        }
-        
-        # Create user
-        user = User.objects.create_user(**user_data)
+        user_data = {field: validated_data.pop(field) for field in USER_FIELDS}
         
-        # Create patient with user
-        patient = Patient.objects.create(user=user, **validated_data)
+        # Create user and patient together, so a failed patient insert leaves no orphan user
+        with transaction.atomic():
+            user = User.objects.create_user(**user_data)
+            patient = Patient.objects.create(user=user, **validated_data)
         return patient
 
 class MedicalRecordSerializer(serializers.ModelSerializer):
@@ -1,5 +1,6 @@
 from django.shortcuts import render
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Patient, MedicalRecord, Appointment, Prescription, LabResult
 from .serializers import (
@@ -10,7 +11,8 @@ from .serializers import (
 # Create your views here.
 
 class PatientViewSet(viewsets.ModelViewSet):
-    queryset = Patient.objects.all()
+    # PatientSerializer nests the user; join it instead of one query per row
+    queryset = Patient.objects.select_related('user').all()
     serializer_class = PatientSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -18,6 +20,14 @@ class PatientViewSet(viewsets.ModelViewSet):
     search_fields = ['user__first_name', 'user__last_name', 'mrn']
     ordering_fields = ['created_at', 'updated_at']
 
+    def create(self, request, *args, **kwargs):
+        # A JSON list onboards many patients at once through PatientListSerializer
+        serializer = self.get_serializer(data=request.data, many=isinstance(request.data, list))
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
 class MedicalRecordViewSet(viewsets.ModelViewSet):
     queryset = MedicalRecord.objects.all()
     serializer_class = MedicalRecordSerializer
@@ -1,18 +1,45 @@
 from django.shortcuts import render
 from django.http import JsonResponse
+from django.core.cache import cache
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from django.views.decorators.csrf import csrf_exempt
 import psutil
+import threading
 import time
 
+# Monitoring dashboards poll these endpoints every few seconds; payloads are
+# system-wide, so every client shares one cached copy for this many seconds
+MONITORING_CACHE_TTL = 5
+CPU_SAMPLE_INTERVAL = 1.0
+
+_cpu_usage = 0.0
+_cpu_sampler = None
+_cpu_sampler_lock = threading.Lock()
+
+def _sample_cpu():
+    global _cpu_usage
+    while True:
+        # Blocks for the interval and returns utilisation averaged over it
+        _cpu_usage = psutil.cpu_percent(interval=CPU_SAMPLE_INTERVAL)
+
+def _get_cpu_usage():
+    """Latest CPU utilisation from the background sampler, started on first use."""
+    global _cpu_sampler
+    if _cpu_sampler is None:
+        with _cpu_sampler_lock:
+            if _cpu_sampler is None:
+                _cpu_sampler = threading.Thread(target=_sample_cpu, name='cpu-sampler', daemon=True)
+                _cpu_sampler.start()
+    return _cpu_usage
+
 # Create your views here.
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def health_status(request):
     """Return the current health status of the system."""
-    return JsonResponse({
+    return JsonResponse(cache.get_or_set('self_healing:health_status', lambda: {
         'status': 'healthy',
         'timestamp': time.time(),
         'services': {
@@ -20,24 +47,24 @@ def health_status(request):
             'cache': 'operational',
             'celery': 'operational'
         }
-    })
+    }, timeout=MONITORING_CACHE_TTL))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def system_metrics(request):
     """Return current system metrics."""
-    return JsonResponse({
-        'cpu_usage': psutil.cpu_percent(),
+    return JsonResponse(cache.get_or_set('self_healing:system_metrics', lambda: {
+        'cpu_usage': _get_cpu_usage(),
         'memory_usage': psutil.virtual_memory().percent,
         'disk_usage': psutil.disk_usage('/').percent,
         'timestamp': time.time()
-    })
+    }, timeout=MONITORING_CACHE_TTL))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def alerts(request):
     """Return current system alerts."""
-    return JsonResponse({
+    return JsonResponse(cache.get_or_set('self_healing:alerts', lambda: {
         'alerts': [],
         'timestamp': time.time()
-    })
+    }, timeout=MONITORING_CACHE_TTL))